@@ -0,0 +1,189 @@
+import multiprocessing as mp
+import numpy as np
+from multiprocessing import shared_memory
+
+from rl import RLSelfPlay
+from transposition import SharedTable
+
+ROW = 10 # keys of episode, -1 padded, then utility
+
+def encode_episode(board):
+    """Return row of keys played on terminal board, -1 padded, utility."""
+    row = np.full(ROW, -1, np.int8)
+    moves = board.moves()
+    row[:moves] = board.played_keys[:moves]
+    row[-1] = board.utility()
+    return row
+
+def decode_episode(row, board):
+    """Push keys of row onto reset board."""
+    for key in row[:-1]:
+        if key < 0:
+            break
+        board.push(int(key))
+
+class EpisodeQueue:
+    """
+    Bounded queue of episode rows in a shared memory ring buffer.
+
+    Rows are copied into and out of one block of shared memory, so no
+    pickling or pipe writes per episode. Semaphores count free and filled
+    slots, lock guards the read and write positions. Safe for many
+    producers and many consumers.
+    """
+
+    def __init__(self, capacity=1024, ctx=mp):
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(create=True,
+                                              size=capacity*ROW)
+        self.head = ctx.Value('q', 0, lock=False) # next row read
+        self.tail = ctx.Value('q', 0, lock=False) # next row written
+        self.lock = ctx.Lock()
+        self.slots = ctx.Semaphore(capacity)
+        self.items = ctx.Semaphore(0)
+        self.set_rows()
+
+    def set_rows(self):
+        self.rows = np.ndarray((self.capacity, ROW), np.int8,
+                               buffer=self.shm.buf)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['rows']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.set_rows()
+
+    def put(self, row, timeout=None):
+        """Copy row into queue. Return False if full past timeout."""
+        if not self.slots.acquire(timeout=timeout):
+            return False
+        with self.lock:
+            self.rows[self.tail.value % self.capacity] = row
+            self.tail.value += 1
+        self.items.release()
+        return True
+
+    def get(self, timeout=None):
+        """Return copy of oldest row. None if empty past timeout."""
+        if not self.items.acquire(timeout=timeout):
+            return None
+        with self.lock:
+            row = self.rows[self.head.value % self.capacity].copy()
+            self.head.value += 1
+        self.slots.release()
+        return row
+
+    def close(self):
+        """Release view, free block. Call once, in owning process."""
+        del self.rows
+        self.shm.close()
+        self.shm.unlink()
+
+def run_actor(rl, rl_kwargs, seed, queue, values, visits, stop):
+    """Actor process. Generate episodes with latest tables until stop."""
+    rl = rl(seed=seed, **rl_kwargs)
+    values_version = visits_version = -1
+    while not stop.is_set():
+        values_version = values.pull(rl.values.values, values_version)
+        visits_version = visits.pull(rl.visits.values, visits_version)
+        rl.board.reset()
+        rl.generate_episode()
+        row = encode_episode(rl.board)
+        while not queue.put(row, timeout=.1):
+            if stop.is_set():
+                return
+
+class ActorLearner:
+    """
+    Self-play split into actor processes and one learner.
+
+    Each actor is an instance of learner cls rl, with its own seed. It plays
+    episodes by its policy on a private copy of the latest published tables,
+    and streams each finished episode into a shared queue as a compact row
+    of keys and utility. The learner, in this process, replays rows onto its
+    board and applies its own evaluate_episode, so MC, TD, TD(lambda), Q and
+    QS updates are unchanged. Every publish episodes it publishes its tables.
+
+    Actors act on tables up to publish episodes old, so updates are slightly
+    off policy. Learners that override run_episode or policy, as TS learners
+    that update values inside policy, are not supported: their updates
+    would stay in the actors. An actor that dies raises in run.
+
+    attributes:
+        rl -- learner instance, owns values and visits
+        episodes -- number of episodes learned
+    """
+
+    def __init__(self, rl, rl_kwargs=None, actors=2, publish=64,
+                 capacity=1024, seed=None, ctx=None):
+        for name in ('run_episode', 'policy'):
+            if getattr(rl, name) is not getattr(RLSelfPlay, name):
+                raise ValueError('%s overrides %s, actors need episodes of '
+                                 'RLSelfPlay' % (rl.__name__, name))
+        if rl_kwargs is None:
+            rl_kwargs = {}
+        if ctx is None:
+            ctx = mp.get_context()
+        seeds = np.random.SeedSequence(seed).spawn(actors + 1)
+        self.rl = rl(seed=seeds[0], **rl_kwargs)
+        self.publish = publish
+        self.episodes = 0
+        self.ctx = ctx
+        self.queue = EpisodeQueue(capacity, ctx)
+        # published tables, visits so epsilon of actors decays
+        self.values = SharedTable()
+        self.visits = SharedTable()
+        self.args = [(rl, rl_kwargs, actor_seed) for actor_seed in seeds[1:]]
+
+    def run(self, episodes):
+        """Start actors, learn given number of episodes, stop actors."""
+        stop = self.ctx.Event()
+        self.publish_tables()
+        processes = [self.ctx.Process(target=run_actor, daemon=True,
+                                      args=args + (self.queue, self.values,
+                                                   self.visits, stop))
+                     for args in self.args]
+        for process in processes:
+            process.start()
+        try:
+            for _ in range(episodes):
+                row = self.queue.get(timeout=.1)
+                while row is None:
+                    self.check_actors(processes)
+                    row = self.queue.get(timeout=.1)
+                self.learn(row)
+        finally:
+            stop.set()
+            for process in processes:
+                while process.is_alive():
+                    self.queue.get(timeout=.01) # unblock full queue
+                    process.join(.01)
+
+    def check_actors(self, processes):
+        """Raise RuntimeError if an actor exited. Actors run until stop."""
+        for process in processes:
+            if process.exitcode is not None:
+                raise RuntimeError('actor exited with code %d'
+                                   % process.exitcode)
+
+    def learn(self, row):
+        """Replay episode row onto learner board, evaluate. Publish."""
+        self.rl.board.reset()
+        decode_episode(row, self.rl.board)
+        self.rl.evaluate_episode()
+        self.episodes += 1
+        if not self.episodes % self.publish:
+            self.publish_tables()
+
+    def publish_tables(self):
+        self.values.publish(self.rl.values.values)
+        self.visits.publish(self.rl.visits.values)
+
+    def close(self):
+        """Free shared memory."""
+        self.queue.close()
+        self.values.close()
+        self.visits.close()
@@ -1,4 +1,5 @@
 import numpy as np
+from inspect import signature
 
 from board import Board
 from transposition import Table
@@ -6,6 +7,8 @@ from search import RandomSearch, TreeSearch
 from dp import UniformTree, DiscountTree
 from minimax import MinimaxTree, NegaminTree
 from rl import RLSelfPlayTree
+from mcts import MCTSTree
+from pns import PNSTree
 
 import os
 
@@ -59,61 +62,85 @@ class Spawn:
 
     Search parameter is tree, tree parameter is kwargs. Attributes are dict
     maps from name (str) to either: search (cls), tree (cls or inst), tree kwargs (if tree is cls).
+
+    Adding an agent only registers it. Trees of names in lazy are loaded
+    from saved values, else built and saved, on first get_agent, then
+    shared by later agents of that name.
     """
 
     names = []
     searches = {}
     trees = {}
     tree_kwargs = {}
+    lazy = set()
 
     @classmethod
-    def get_agent(cls, name, search=None, tree=None, tree_kwargs=()):
+    def get_agent(cls, name, search=None, tree=None, tree_kwargs=(),
+                  seed=None):
         """Return instance of agent. If parameters null, use cls attr."""
-        search = cls.get_search(name, search, tree, tree_kwargs)
+        search = cls.get_search(name, search, tree, tree_kwargs, seed)
         return Agent(name, search)
 
     @classmethod
-    def get_search(cls, name, search, tree, tree_kwargs):
-        """Return search instance from tree."""
+    def get_search(cls, name, search, tree, tree_kwargs, seed=None):
+        """Return search instance from tree. Seed its rng.
+
+        A tree built here that takes a seed, as MCTSTree, is seeded by a
+        child of seed, spawned beside the child seeding the search."""
         if not search:
             if name not in cls.names:
                 name = 'user'
             search, tree, tree_kwargs = cls._get_search_kwargs(name)
         if tree_kwargs:
+            if seed is not None and 'seed' in signature(tree).parameters:
+                if not hasattr(seed, 'spawn'):
+                    seed = np.random.SeedSequence(seed)
+                seed, tree_seed = seed.spawn(2)
+                tree_kwargs = dict(tree_kwargs, seed=tree_seed)
             tree = tree(**tree_kwargs)
-        return search(tree)
+        return search(tree, seed=seed)
 
     @classmethod
     def _get_search_kwargs(cls, name):
-        """Return triplet (search, tree, kwargs) mapped from cls attributes."""
+        """Return triplet (search, tree, kwargs) mapped from cls attributes.
+
+        Set tree of lazy name on first call."""
+        if name in cls.lazy:
+            cls.trees[name] = cls._get_tree(name, cls.trees[name],
+                                            cls.tree_kwargs[name])
+            cls.tree_kwargs[name] = {}
+            cls.lazy.discard(name)
         return (cls.searches[name], cls.trees[name], cls.tree_kwargs[name])
 
     @classmethod
     def add_agent(cls, name, search, tree, tree_kwargs, set_tree):
-        """Add predefined agent type to cls attributes for easy creation."""
-        cls.names.append(name)
+        """Add predefined agent type to cls attributes for easy creation.
+
+        If set_tree, tree is set once, when first agent is created."""
+        if name not in cls.names:
+            cls.names.append(name)
         cls.searches[name] = search
-        if set_tree:
-            tree = cls._get_tree(name, tree, tree_kwargs)
-            tree_kwargs.clear()
         cls.trees[name] = tree
         cls.tree_kwargs[name] = tree_kwargs
+        if set_tree:
+            cls.lazy.add(name)
+        else:
+            cls.lazy.discard(name)
 
     @classmethod
     def _get_tree(cls, name, tree, tree_kwargs):
+        """Return tree on values saved under name, memory mapped.
+
+        If not saved, build tree and save values. RL values are learned, not
+        built, so raise FileNotFoundError."""
         table = Table()
-        loaded = table.load_values(name)
+        loaded = table.load_values(name, mmap=True)
         if not loaded:
-            if name in ('mc', 'tdl', 'qs', 'ts'):
-                print('not loaded!', name)
-                exit()
+            if issubclass(tree, RLSelfPlayTree):
+                raise FileNotFoundError('not loaded! ' + name)
             table = None
-        tree_kwargs['table'] = table
-        tree = tree(**tree_kwargs)
+        tree = tree(**dict(tree_kwargs, table=table))
         if not loaded:
-            if name in ('mc', 'tdl', 'qs', 'ts'):
-                print('not loaded!', name)
-                exit()
             tree.table.save_values(name)
         return tree
 
@@ -130,5 +157,9 @@ Spawn.add_agent('tdl', TreeSearch, RLSelfPlayTree, {}, True)
 Spawn.add_agent('qs', TreeSearch, RLSelfPlayTree, {}, True)
 Spawn.add_agent('ts', TreeSearch, RLSelfPlayTree, {}, True)
 
+# new tree each agent, statistics reused between moves of a game
+Spawn.add_agent('mcts', TreeSearch, MCTSTree, {'iterations': 1000}, False)
+Spawn.add_agent('pns', TreeSearch, PNSTree, {'max_nodes': 100000}, False)
+
 
-# 'ts', 'mcts', 'ucts', 'user'
+# 'user'
@@ -0,0 +1,193 @@
+import numpy as np
+import os
+import sys
+import time
+
+from board import Board
+from transposition import Table
+from dp import UniformTree
+from minimax import MinimaxTree
+from rl import MCSelfPlay, TDSelfPlay, TDLSelfPlay
+from ql import QSelfPlay, QSSelfPlay
+from ts import TSSelfPlay, TSABSelfPlay
+from ps import PSSelfPlay
+from mcts import MCTSTree
+from rollout import rollout
+from game import Game
+from agent import Spawn
+
+DATA_PATH = os.getcwd() + '/data/'
+
+KEYS = (4, 0, 2, 6, 3, 5, 1, 7, 8) # drawn game
+
+def bench_board_push_pop():
+    """Push then pop a full game of keys."""
+    board = Board()
+    def run():
+        for key in KEYS:
+            board.push(key)
+        for _ in KEYS:
+            board.pop()
+    return run, 2*len(KEYS)
+
+def bench_board_hash():
+    """Hash board at each ply of a game."""
+    boards = []
+    board = Board()
+    for key in KEYS:
+        board.push(key)
+        boards.append(board.copy())
+    def run():
+        for board in boards:
+            hash(board)
+    return run, len(boards)
+
+def bench_table_get():
+    """Get table value at each ply of a game."""
+    table = MinimaxTree().table
+    boards = []
+    board = Board()
+    for key in KEYS:
+        board.push(key)
+        boards.append(board.copy())
+    def run():
+        for board in boards:
+            table[board]
+    return run, len(boards)
+
+def bench_table_set():
+    """Set table value at each ply of a game."""
+    table = Table()
+    boards = []
+    board = Board()
+    for key in KEYS:
+        board.push(key)
+        boards.append(board.copy())
+    def run():
+        for board in boards:
+            table[board] = 0
+    return run, len(boards)
+
+def bench_minimax_tree():
+    """Build complete minimax tree."""
+    return MinimaxTree, 1
+
+def bench_uniform_tree():
+    """Build complete uniform tree."""
+    return UniformTree, 1
+
+def bench_game_compete():
+    """Compete minimax against random agent."""
+    game = Game(agent1=Spawn.get_agent('minimax'),
+                agent2=Spawn.get_agent('random'))
+    return lambda: game.compete(10), 10
+
+def bench_mcts_search(iterations=200):
+    """Search from empty board with fresh statistics."""
+    def run():
+        MCTSTree(iterations, seed=0).search(Board())
+    return run, iterations
+
+def bench_rollout(batch=64):
+    """Random rollouts of batch of empty boards, vectorized."""
+    boards = np.zeros((batch, 9), int)
+    rng = np.random.default_rng(0)
+    return lambda: rollout(boards, rng), batch
+
+def bench_selfplay(rl, episodes=10):
+    """Return benchmark of run of episodes of rl self-play.
+
+    Each call seeds and runs a fresh instance, so every call does the same
+    work no matter how long the benchmark loops."""
+    def bench():
+        def run():
+            rl(seed=0).run(episodes)
+        return run, episodes
+    return bench
+
+BENCHMARKS = {
+    'board_push_pop': bench_board_push_pop,
+    'board_hash': bench_board_hash,
+    'table_get': bench_table_get,
+    'table_set': bench_table_set,
+    'minimax_tree': bench_minimax_tree,
+    'uniform_tree': bench_uniform_tree,
+    'game_compete': bench_game_compete,
+    'mcts_search': bench_mcts_search,
+    'rollout': bench_rollout,
+    'mc_run': bench_selfplay(MCSelfPlay),
+    'td_run': bench_selfplay(TDSelfPlay),
+    'tdl_run': bench_selfplay(TDLSelfPlay),
+    'q_run': bench_selfplay(QSelfPlay),
+    'qs_run': bench_selfplay(QSSelfPlay),
+    'ts_run': bench_selfplay(TSSelfPlay),
+    'tsab_run': bench_selfplay(TSABSelfPlay),
+    'ps_run': bench_selfplay(PSSelfPlay),
+}
+
+def time_bench(name, min_time=.2, repeat=5):
+    """Return seconds per op of benchmark. Best of repeat timings.
+
+    Calls are looped until at least min_time seconds pass, so fast ops are
+    timed over many calls."""
+    run, ops = BENCHMARKS[name]()
+    run() # warm up caches, lazy tables
+    best = float('inf')
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0
+        while elapsed < min_time:
+            run()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed / (calls*ops))
+    return best
+
+def run_benches(names=None, min_time=.2, repeat=5):
+    """Return dict maps benchmark name to seconds per op."""
+    if not names:
+        names = BENCHMARKS
+    return {name: time_bench(name, min_time, repeat) for name in names}
+
+def save_baseline(results):
+    path = DATA_PATH + 'bench_baseline.npy'
+    baseline = load_baseline()
+    baseline.update(results)
+    np.save(path, baseline)
+
+def load_baseline():
+    try:
+        return np.load(DATA_PATH + 'bench_baseline.npy',
+                       allow_pickle='TRUE').item()
+    except FileNotFoundError:
+        return {}
+
+def report(results, baseline=None, threshold=.1):
+    """Return table str of ops/sec, latency, change against baseline.
+
+    Benchmarks slower than baseline by more than threshold are flagged."""
+    if baseline is None:
+        baseline = {}
+    lines = ['%-16s %14s %12s %10s' % ('name', 'ops/sec', 'usec/op',
+                                       'change')]
+    for name, seconds in results.items():
+        line = '%-16s %14.1f %12.3f' % (name, 1/seconds, 1e6*seconds)
+        if name in baseline:
+            change = seconds / baseline[name] - 1
+            line += ' %+9.1f%%' % (100*change)
+            if change > threshold:
+                line += ' REGRESSION'
+        lines.append(line)
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    # python bench.py [--save] [name ...]
+    args = sys.argv[1:]
+    save = '--save' in args
+    names = [arg for arg in args if arg != '--save']
+    results = run_benches(names)
+    print(report(results, load_baseline()))
+    if save:
+        save_baseline(results)
+        print('baseline saved!', '\n')
@@ -1,6 +1,15 @@
 import numpy as np
 from board_hash import HashTable
 
+# python lists of HashTable arrays, faster scalar access
+HASH_KEYS = HashTable.hash_keys.tolist()
+HASH_VALUES = HashTable.hash_values.tolist()
+WINNERS = [None if value == 3 else value
+           for value in HashTable.win_values.tolist()]
+# hash value of each 9 bit mask of keys played by agent 1, agent 2
+MASK_HASH = [[sum(HASH_KEYS[turn][key] for key in range(9) if mask >> key & 1)
+              for mask in range(512)] for turn in (1, 2)]
+
 class Board:
     """
     Represents physical playing area: 3 by 3 grid.
@@ -32,35 +41,63 @@ class Board:
     This array is values attribute. All other attributes allow for efficient
     search of previous and following game states, used by AI agents in search.
 
+    Search and learners push, pop and copy boards constantly, so state is
+    kept in slots as a bytearray of cells and plain ints. Values is a numpy
+    view of cells, made on first access. Copy copies cells and ints only.
+
     Attributes:
-        values -- array of current board state
-        played_keys -- list of cell positions played
-        open_keys -- set of cell positions yet to be played
+        cells -- bytearray of current board state
+        values -- numpy array view of cells, read by features and printing
+        played -- int of played keys packed 4 bits each, first key lowest
+        move_count -- number of keys played
+        bits -- int of keys of agent 1 in bits 0-8, agent 2 in bits 9-17
         winner --
             None -- no winner, board is not full
             0 -- draw, no winner    1 -- agent 1 won    2 -- agent 2 won
         hash_value -- hash value of current board
     """
 
-    def __init__(self, values=None, played_keys=None, open_keys=None,
-                 winner=None, hash_value=None):
-        if values is None:
-            values = np.zeros(9, int)
-            played_keys = []
-            open_keys = set(range(9))
-            winner = None
-            hash_value = 0
-        self.values = values
-        self.played_keys = played_keys
-        self.open_keys = open_keys
+    __slots__ = ('cells', 'played', 'move_count', 'bits', 'winner',
+                 'hash_value', '_values')
+
+    def __init__(self, cells=None, played=0, move_count=0, bits=0,
+                 winner=None, hash_value=0):
+        if cells is None:
+            cells = bytearray(9)
+        self.cells = cells
+        self.played = played
+        self.move_count = move_count
+        self.bits = bits
         self.winner = winner
         self.hash_value = hash_value
+        self._values = None
+
+    def __reduce__(self):
+        return Board, (bytearray(self.cells), self.played, self.move_count,
+                       self.bits, self.winner, self.hash_value)
+
+    @property
+    def values(self):
+        """Numpy array view of cells. Changes with board."""
+        if self._values is None:
+            self._values = np.frombuffer(self.cells, np.uint8)
+        return self._values
+
+    @property
+    def played_keys(self):
+        """List of cell positions played, in order."""
+        return [(self.played >> 4*i) & 15 for i in range(self.move_count)]
+
+    @property
+    def open_keys(self):
+        """Set of cell positions yet to be played."""
+        return {key for key in range(9) if not self.cells[key]}
 
     ## State methods: abstractions from values ##
 
     def moves(self):
         """Return number of keys already played."""
-        return len(self.played_keys)
+        return self.move_count
 
     def turn(self):
         """Return number of current agent.
@@ -68,18 +105,17 @@ class Board:
         Current agent is next to act on board. agent 1 is first to act on
         empty board. agent 2 follows. Turns are alternated.
         """
-        return 1 + self.moves() % 2
+        return 1 + (self.move_count & 1)
 
     def other(self):
         """Return opponents agent number i.e. the agent that last played."""
-        return 2 - self.moves() % 2
+        return 2 - (self.move_count & 1)
 
     def last_key(self):
         """Return last played key or None if empty board."""
-        try:
-            return self.played_keys[-1]
-        except IndexError:
+        if not self.move_count:
             return None
+        return (self.played >> 4*(self.move_count-1)) & 15
 
     def is_terminal(self):
         """Return True if there is a winner or draw. Else play may continue."""
@@ -87,43 +123,58 @@ class Board:
 
     def __hash__(self):
         """Return hash int. Equates symmetric boards, transpositions."""
-        return HashTable.get_hash(self.hash_value)
+        return HASH_VALUES[self.hash_value]
 
     def __eq__(self, other):
-        """Boards of equal hash are equal."""
-        return hash(self) == hash(other) if isinstance(other, Board) else False
+        """Boards, snapshots of equal hash are equal."""
+        if isinstance(other, (Board, Snapshot)):
+            return hash(self) == hash(other)
+        return False
+
+    def snapshot(self):
+        """Return immutable Snapshot of position."""
+        return Snapshot(self.bits)
 
     ## Play methods: used during game runs and AI search, alter state ###
 
     def get_actions(self):
-        """Return tuple of legal actions by agents. Actions are open keys."""
-        return tuple(self.open_keys)
+        """Return tuple of legal actions by agents. Actions are open keys.
+
+        Sorted, so equal boards give equal random choices from the same
+        rng state."""
+        cells = self.cells
+        return tuple(key for key in range(9) if not cells[key])
 
     def push(self, key):
         """Play key: set values to current agent number at key index."""
-        assert not self.values[key], (key, self.values)
-        self.values[key] = self.turn()
-        # Turn is function of number of moves i.e. len of played_keys.
-        # Call hash key before incrementing number of moves.
-        self.hash_value += HashTable.get_hash_key(self.turn(), key)
-        self.played_keys.append(key)
-        self.open_keys.remove(key)
-        self.winner = HashTable.get_winner(hash(self))
+        assert not self.cells[key], (key, self.values)
+        turn = 1 + (self.move_count & 1)
+        self.cells[key] = turn
+        self.hash_value += HASH_KEYS[turn][key]
+        self.played |= key << 4*self.move_count
+        self.move_count += 1
+        self.bits |= 1 << (key + 9*turn - 9)
+        self.winner = WINNERS[HASH_VALUES[self.hash_value]]
 
     def pop(self):
         """Undo play of last key. Return last key."""
-        last_key = self.played_keys.pop()
-        self.values[last_key] = 0
-        self.open_keys.add(last_key)
+        self.move_count -= 1
+        shift = 4*self.move_count
+        last_key = (self.played >> shift) & 15
+        self.played ^= last_key << shift
+        self.cells[last_key] = 0
         self.winner = None
-        self.hash_value -= HashTable.get_hash_key(self.turn(), last_key)
+        turn = 1 + (self.move_count & 1)
+        self.hash_value -= HASH_KEYS[turn][last_key]
+        self.bits ^= 1 << (last_key + 9*turn - 9)
         return last_key
 
     def reset(self):
         """Empty board. Ready for new game."""
-        self.values[:] = 0
-        self.played_keys.clear()
-        self.open_keys = set(range(9))
+        self.cells[:] = bytes(9)
+        self.played = 0
+        self.move_count = 0
+        self.bits = 0
         self.winner = None
         self.hash_value = 0
 
@@ -181,5 +232,60 @@ class Board:
 
     def copy(self):
         """Return deep copy of current instance."""
-        return Board(np.array(self.values), list(self.played_keys),
-                     set(self.open_keys), self.winner, self.hash_value)
+        return Board(bytearray(self.cells), self.played, self.move_count,
+                     self.bits, self.winner, self.hash_value)
+
+class Snapshot(int):
+    """
+    Immutable position, packed in an int as Board.bits: keys of agent 1 in
+    bits 0-8, keys of agent 2 in bits 9-17.
+
+    Hash and equality are canonical, as for Board, so a snapshot keys
+    tables and dicts in place of the board it was taken from, and equals
+    snapshots of symmetric positions and transpositions. Hash is two list
+    lookups by mask. Order of play is not kept, to_board plays keys of
+    each agent in key order. int(snapshot) is the raw position, a few bytes
+    to pickle or send between processes.
+    """
+
+    __slots__ = ()
+
+    @property
+    def hash_value(self):
+        return MASK_HASH[0][self & 511] + MASK_HASH[1][self >> 9]
+
+    def __hash__(self):
+        return HASH_VALUES[self.hash_value]
+
+    def __eq__(self, other):
+        if isinstance(other, (Board, Snapshot)):
+            return hash(self) == hash(other)
+        return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __reduce__(self):
+        return Snapshot, (int(self),)
+
+    def __repr__(self):
+        return 'Snapshot(%d)' % self
+
+    def moves(self):
+        return bin(self).count('1')
+
+    def to_board(self):
+        """Return Board of position."""
+        ones = [key for key in range(9) if self >> key & 1]
+        twos = [key for key in range(9) if self >> (key + 9) & 1]
+        cells = bytearray(9)
+        played = 0
+        for i, key in enumerate(ones):
+            cells[key] = 1
+            played |= key << 8*i
+        for i, key in enumerate(twos):
+            cells[key] = 2
+            played |= key << 8*i + 4
+        hash_value = self.hash_value
+        return Board(cells, played, len(ones) + len(twos), int(self),
+                     WINNERS[HASH_VALUES[hash_value]], hash_value)
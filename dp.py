@@ -1,4 +1,7 @@
+import numpy as np
+
 from board import Board
+from graph import get_graph
 from tree import Tree
 
 class DPTree(Tree):
@@ -77,7 +80,7 @@ class DiscountTree(UniformTree):
 
     def __init__(self, table=None, board=None, gamma=.9):
         self.gamma = gamma
-        super().__init__(board)
+        super().__init__(table, board)
 
     def explore(self):
         """Add children depth first, backup discounted mean to parent. Recurse.
@@ -102,3 +105,89 @@ class DiscountTree(UniformTree):
     def discount(self, value):
         """Discount value by rate gamma."""
         return self.gamma * value
+
+def get_discount_values(gammas, utilities=None):
+    """Return array of discount tree values, one row for each gamma.
+
+    Solve all trees together over the game graph, one level of moves at a
+    time from the leaves. Each level is a matrix product of the values of
+    the level below with the mean matrix of children.
+
+    utilities -- array of leaf values by hash, default to board utility
+    """
+    graph = get_graph()
+    if utilities is None:
+        utilities = graph.utilities
+    gammas = np.asarray(gammas, dtype=float).reshape(-1, 1)
+    means = get_mean_matrix()
+    values = np.zeros((len(gammas), 765))
+    values[:, graph.terminals] = utilities[graph.terminals]
+    for level in graph.levels:
+        level = level[~graph.terminals[level]]
+        values[:, level] = gammas * (values @ means[level].T)
+    return values
+
+MEAN_MATRIX = []
+
+def get_mean_matrix():
+    """Return 765 x 765 array, row of parent averages its child values."""
+    if not MEAN_MATRIX:
+        graph = get_graph()
+        means = np.zeros((765, 765))
+        for state, children in enumerate(graph.children):
+            for child in children:
+                means[state, child] += 1 / len(children)
+        MEAN_MATRIX.append(means)
+    return MEAN_MATRIX[0]
+
+class IncrementalDiscountTree(DiscountTree):
+    """
+    Discount tree solved over game graph, updated in place on change.
+
+    Same values as DiscountTree. Changing a leaf utility only recomputes its
+    ancestors, one level at a time through the parent index, and stops where
+    values are unchanged. Changing gamma changes every interior value, so the
+    whole graph is solved again in one vectorized pass.
+    """
+
+    def __init__(self, table=None, gamma=.9, utilities=None):
+        Tree.__init__(self, table)
+        self.gamma = gamma
+        self.graph = get_graph()
+        if utilities is None:
+            utilities = self.graph.utilities.copy()
+        self.utilities = utilities
+        self.solve()
+
+    def solve(self):
+        """Set all table values from leaf utilities."""
+        self.table.values[:] = get_discount_values(self.gamma,
+                                                   self.utilities)[0]
+
+    def set_gamma(self, gamma):
+        """Change discount rate. Solve again."""
+        self.gamma = gamma
+        self.solve()
+
+    def set_utility(self, board, utility):
+        """Change value of terminal board. Propagate to ancestors."""
+        state = hash(board)
+        assert self.graph.terminals[state], board
+        self.utilities[state] = utility
+        self.table.values[state] = utility
+        self.propagate(self.graph.parents[state])
+
+    def propagate(self, frontier):
+        """Recompute frontier states, then parents of those that changed."""
+        values = self.table.values
+        while frontier:
+            changed = set()
+            for state in frontier:
+                children = values[list(self.graph.children[state])]
+                value = self.discount(children.mean())
+                if value != values[state]:
+                    values[state] = value
+                    changed.add(state)
+            frontier = set()
+            for state in changed:
+                frontier |= self.graph.parents[state]
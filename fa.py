@@ -0,0 +1,167 @@
+import numpy as np
+
+from features import Features
+from graph import get_graph
+from transposition import Table
+from rl import TDLSelfPlay
+from ts import TSSelfPlay
+
+FEATURE_MATRICES = {}
+
+def get_feature_matrix(features):
+    """Return (features, terminals, utilities) arrays indexed by state hash.
+
+    Features are symmetric, so each of the 765 states is extracted once from
+    its representative board in the game graph. Result is cached per features
+    class."""
+    if features not in FEATURE_MATRICES:
+        graph = get_graph()
+        phi = np.array([features.get_features(board)
+                        for board in graph.boards], dtype=float)
+        FEATURE_MATRICES[features] = (phi, np.flatnonzero(graph.terminals),
+                                      graph.utilities)
+    return FEATURE_MATRICES[features]
+
+class LinearTable(Table):
+    """
+    Table of values approximated by linear function of board features.
+
+    Value of state equals dot product of its feature row and weights. Values
+    attribute caches this product for all states so lookups remain array
+    access. Terminal values are known and pinned to their utility.
+
+    Targets are queued during an episode, then applied as one batched
+    gradient step. Each row is normalized by its squared feature norm so
+    alpha has the same meaning as for tabular learners.
+    """
+
+    def __init__(self, features=Features, weights=None):
+        self.features, self.terminals, self.utilities = (
+            get_feature_matrix(features))
+        self.norms = np.maximum((self.features**2).sum(axis=1), 1)
+        if weights is None:
+            weights = np.zeros(self.features.shape[1])
+        self.weights = weights
+        self.batch_ids = []
+        self.batch_targets = []
+        super().__init__(np.empty(765))
+        self.refresh()
+
+    def refresh(self):
+        """Recompute cached values from weights."""
+        np.dot(self.features, self.weights, out=self.values)
+        self.values[self.terminals] = self.utilities[self.terminals]
+
+    def add_target(self, board, target):
+        """Queue target value of board for next update."""
+        self.batch_ids.append(hash(board))
+        self.batch_targets.append(target)
+
+    def update(self, alpha):
+        """Gradient step toward queued targets. Clear queue, refresh."""
+        if not self.batch_ids:
+            return
+        ids = np.array(self.batch_ids)
+        errors = np.array(self.batch_targets) - self.values[ids]
+        # states of one batch share features, scale step by sqrt batch size
+        self.weights += alpha * ((errors / self.norms[ids]) @
+                                 self.features[ids]) / len(ids) ** .5
+        self.batch_ids.clear()
+        self.batch_targets.clear()
+        self.refresh()
+
+    def get_state(self):
+        """Return dict of arrays that restores table: weights, queue."""
+        return {'weights': self.weights,
+                'batch_ids': np.array(self.batch_ids, int),
+                'batch_targets': np.array(self.batch_targets, float)}
+
+    def set_state(self, state):
+        """Restore table from dict of get_state."""
+        self.weights[:] = state['weights']
+        self.batch_ids[:] = state['batch_ids'].tolist()
+        self.batch_targets[:] = state['batch_targets'].tolist()
+        self.refresh()
+
+class TDLFASelfPlay(TDLSelfPlay):
+    """TD lambda over linear function approximation of values.
+
+    Lambda returns are computed along the episode with current weights, then
+    applied together as one batched update every batch episodes."""
+
+    def __init__(self, gamma=1, alpha=.5, epsilon=1, lambda_=.5,
+                 features=Features, batch=1, values=None, visits=None,
+                 seed=None):
+        if values is None:
+            values = LinearTable(features)
+        super().__init__(gamma, alpha, epsilon, lambda_, values, visits,
+                         seed)
+        self.batch = batch
+        self.episodes = 0
+
+    def evaluate_episode(self):
+        """Queue lambda return of each state. Update every batch episodes.
+
+        Undo board moves on each step. Reward is zero for non leaf nodes."""
+        G = self.board.utility()
+        self.visits[self.board] += 1
+        for _ in range(self.board.moves()):
+            self.board.pop()
+            self.visits[self.board] += 1
+            self.values.add_target(self.board, G)
+            G = (1 - self.lambda_) * self.values[self.board] + self.lambda_*G
+            G *= self.gamma
+
+        self.episodes += 1
+        if not self.episodes % self.batch:
+            self.values.update(self.alpha)
+
+    def evaluate_states(self, states, G):
+        """Queue lambda return of each state of replay, update weights."""
+        for state in reversed(states[:-1]):
+            self.values.add_target(state, G)
+            G = (1 - self.lambda_) * self.values[state] + self.lambda_*G
+            G *= self.gamma
+        self.values.update(self.alpha)
+
+    def get_state(self):
+        state = super().get_state()
+        state.update(self.values.get_state())
+        state['episodes'] = self.episodes
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.values.set_state(state)
+        self.episodes = int(state['episodes'])
+
+class TSFASelfPlay(TSSelfPlay):
+    """TreeStrap over linear function approximation of values.
+
+    Interior nodes of each minimax search queue their backed up value as a
+    target. All targets of one search are applied as one batched update."""
+
+    def __init__(self, gamma=1, alpha=.5, epsilon=15, depth=3,
+                 features=Features, values=None, visits=None, seed=None):
+        if values is None:
+            values = LinearTable(features)
+        super().__init__(gamma, alpha, epsilon, depth, values, visits, seed)
+
+    def policy(self, greedy, evaluate, delta):
+        action = super().policy(greedy, evaluate, delta)
+        if evaluate:
+            self.values.update(self.alpha)
+        return action
+
+    def evaluate_tree_state(self, G):
+        self.visits[self.board] += 1
+        self.values.add_target(self.board, G)
+
+    def get_state(self):
+        state = super().get_state()
+        state.update(self.values.get_state())
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.values.set_state(state)
@@ -113,3 +113,47 @@ class Features:
             result = hash(board)
             board.pop()
             yield result
+
+class LineFeatures:
+    """Extract line-pattern counts from board.
+
+    Each slice (row, column, diagonal) is classified by how many pieces of
+    each agent it contains, (n1, n2) with n1 + n2 <= 3. Slices are grouped
+    into symmetry classes so features are equal across symmetric boards.
+
+        edges -- rows 0, 2 and columns 0, 2
+        middles -- row 1 and column 1
+        diagonals -- both diagonals
+
+    Count slices of each pattern in each class. The same pattern favors
+    whichever agent moves next, so counts are stored in a separate block for
+    each turn. Last feature is a bias term.
+
+    attributes:
+        classes -- tuple of slice tuples, one per symmetry class
+        patterns -- dict maps (n1, n2) to pattern index
+        length -- total number of features
+    """
+
+    classes = ((SLICES[0], SLICES[2], SLICES[3], SLICES[5]),
+               (SLICES[1], SLICES[4]),
+               (SLICES[6], SLICES[7]))
+    patterns = {(n1, n2): i for i, (n1, n2) in enumerate(
+        (n1, n2) for n1 in range(4) for n2 in range(4-n1))}
+    block = len(classes) * len(patterns)
+    length = 2*block + 1
+
+    @classmethod
+    def get_features(cls, board):
+        """Return int array of pattern counts in block of turn, bias."""
+        result = np.zeros(cls.length, int)
+        r = (board.turn() - 1) * cls.block
+        for slices in cls.classes:
+            for slc in slices:
+                counter = [0, 0, 0]
+                for i in slc:
+                    counter[board.values[i]] += 1
+                result[r + cls.patterns[counter[1], counter[2]]] += 1
+            r += len(cls.patterns)
+        result[-1] = 1
+        return result
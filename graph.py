@@ -0,0 +1,64 @@
+import numpy as np
+
+from board import Board
+
+GRAPH = []
+
+def get_graph():
+    """Return GameGraph instance. Explored once, then cached."""
+    if not GRAPH:
+        GRAPH.append(GameGraph())
+    return GRAPH[0]
+
+class GameGraph:
+    """
+    Explicit game graph over the 765 states, indexed by board hash.
+
+    Trees explore the game recursively and keep only values. Model based
+    learners need the edges themselves: children to back up a state, parents
+    to find which states a changed value affects.
+
+    attributes:
+        boards -- list of a representative board of each state
+        children -- list of child hashes of each state, one per action
+        parents -- list of sets of parent hashes of each state
+        turns -- array of agent to act at each state
+        terminals -- boolean array, True if state is terminal
+        utilities -- array of utility of terminal states, else 0
+        moves -- array of number of moves played at each state
+        levels -- list of arrays of states with equal moves, leaves first
+    """
+
+    def __init__(self):
+        self.boards = [None]*765
+        self.children = [()]*765
+        self.parents = [set() for _ in range(765)]
+        self.turns = np.zeros(765, int)
+        self.terminals = np.zeros(765, bool)
+        self.utilities = np.zeros(765)
+        self.explore(Board())
+        self.moves = np.array([board.moves() for board in self.boards])
+        self.levels = [np.flatnonzero(self.moves == i)
+                       for i in range(9, -1, -1)]
+
+    def explore(self, board):
+        """Add board and its descendants depth first. Skip explored states."""
+        state = hash(board)
+        if self.boards[state] is not None:
+            return state
+        self.boards[state] = board.copy()
+        self.turns[state] = board.turn()
+        if board.is_terminal():
+            self.terminals[state] = True
+            self.utilities[state] = board.utility()
+            return state
+
+        children = []
+        for action in board.get_actions():
+            board.push(action)
+            child = self.explore(board)
+            board.pop()
+            children.append(child)
+            self.parents[child].add(state)
+        self.children[state] = tuple(children)
+        return state
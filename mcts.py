@@ -0,0 +1,259 @@
+import multiprocessing as mp
+import numpy as np
+import time
+
+from tree import Tree
+from rollout import rollout, from_boards
+
+class MCTSTree(Tree):
+    """
+    Monte Carlo tree search with UCT selection over canonical states.
+
+    Each iteration selects children from root by UCT until a state not yet
+    expanded, marks it expanded, completes game by random rollout, then backs
+    up utility to each state of path.
+
+    Statistics are kept per state in arrays indexed by board hash, so
+    symmetric boards and transpositions share visits and values: search runs
+    on the game graph, not a tree. Statistics persist between searches, so
+    a search from a later board reuses all playouts through it. Reset
+    clears them.
+
+    UCT value of child is its mean utility for agent to act plus
+        c * sqrt(log(parent visits) / child visits)
+    Unvisited children are selected first, ties at random.
+
+    With batch > 1, each iteration selects batch paths before any rollout.
+    Each selected path adds virtual_loss lost playouts for agent that moved
+    into each state, so following selections spread over other children.
+    Virtual losses are removed when rollouts of batch are backed up.
+
+    With a tablebase, leaves in it back up their exact value, no rollout.
+
+    attributes:
+        visits -- array of number of playouts through each state
+        totals -- array of sum of utilities of playouts, agent1 pov
+        expanded -- boolean array, True if children may be selected
+        iterations -- playouts per search, None for time_limit only
+        time_limit -- seconds per search, None for iterations only
+        c -- exploration constant
+        batch -- paths selected per iteration, an iteration is batch playouts
+        virtual_loss -- lost playouts added to each state of selected path
+        tablebase -- Tablebase probed at leaves, None for rollouts only
+        rng -- numpy Generator for rollouts, ties
+    """
+
+    def __init__(self, iterations=1000, time_limit=None, c=1.4, batch=1,
+                 virtual_loss=1, tablebase=None, seed=None):
+        super().__init__()
+        self.tablebase = tablebase
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.c = c
+        self.batch = batch
+        self.virtual_loss = virtual_loss
+        self.rng = np.random.default_rng(seed)
+        self.visits = np.zeros(765)
+        self.totals = np.zeros(765)
+        self.expanded = np.zeros(765, bool)
+
+    def reset(self):
+        """Clear statistics of all states."""
+        self.visits[:] = 0
+        self.totals[:] = 0
+        self.expanded[:] = False
+
+    ## Search methods ##
+
+    def search(self, board):
+        """Run playouts from board until budget spent. Return number run.
+
+        Board is restored after each iteration."""
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+        iterations = 0
+        while self.iterations is None or iterations < self.iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if self.batch == 1:
+                self.iterate(board)
+            else:
+                self.iterate_batch(board)
+            iterations += self.batch
+        return iterations
+
+    def iterate(self, board):
+        """Select, expand, rollout, backup once."""
+        path = self.select_path(board)
+        utility = None
+        if self.tablebase is not None:
+            utility = self.tablebase.probe(board)
+        if utility is None:
+            utility = self.rollout(board)
+        for _ in range(len(path) - 1):
+            board.pop()
+        self.backup(path, utility)
+
+    def iterate_batch(self, board):
+        """Select batch paths under virtual loss, rollout each, backup."""
+        paths = []
+        leaves = []
+        for _ in range(self.batch):
+            path = self.select_path(board)
+            leaves.append(board.copy())
+            for _ in range(len(path) - 1):
+                board.pop()
+            self.add_virtual_loss(path, board.moves(), self.virtual_loss)
+            paths.append(path)
+        for path in paths:
+            self.add_virtual_loss(path, board.moves(), -self.virtual_loss)
+        for path, utility in zip(paths, self.rollouts(leaves)):
+            self.backup(path, utility)
+
+    def select_path(self, board):
+        """Push UCT choices onto board until unexpanded state, expand it.
+
+        Return list of hash of each state of path, root first."""
+        path = [hash(board)]
+        while not board.is_terminal() and self.expanded[path[-1]]:
+            board.push(self.select(board))
+            path.append(hash(board))
+        self.expanded[path[-1]] = True
+        return path
+
+    def add_virtual_loss(self, path, moves, loss):
+        """Add loss lost playouts for agent that moved into each state.
+
+        Root of path has given number of moves. Agent1 moved into states of
+        odd moves, agent2 into states of even moves. Root counts visits of
+        paths in flight, so its children have a parent count."""
+        sign = 1 if moves % 2 else -1 # agent1 moved into root
+        for state in path:
+            self.visits[state] += loss
+            self.totals[state] -= sign * loss
+            sign = -sign
+
+    def select(self, board):
+        """Return action of child with best UCT value."""
+        actions = board.get_actions()
+        children = self.get_children(board, actions)
+        visits = self.visits[children]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return actions[unvisited[self.rng.integers(len(unvisited))]]
+        sign = 1 if board.turn() == 1 else -1
+        parent = self.visits[hash(board)]
+        uct = sign * self.totals[children] / visits + (
+            self.c * np.sqrt(np.log(parent) / visits))
+        best = np.flatnonzero(uct == uct.max())
+        return actions[best[self.rng.integers(len(best))]]
+
+    def rollout(self, board):
+        """Return utility of random play to end. Board is restored."""
+        moves = 0
+        while not board.is_terminal():
+            actions = board.get_actions()
+            board.push(actions[self.rng.integers(len(actions))])
+            moves += 1
+        utility = board.utility()
+        for _ in range(moves):
+            board.pop()
+        return utility
+
+    def rollouts(self, boards):
+        """Return array of utility of random play to end of each board.
+
+        Boards are played together by vectorized rollout. Boards in
+        tablebase take their value."""
+        if self.tablebase is None:
+            return rollout(from_boards(boards), self.rng)
+        utilities = [self.tablebase.probe(board) for board in boards]
+        unknown = [i for i, utility in enumerate(utilities) if utility is None]
+        if unknown:
+            results = rollout(from_boards([boards[i] for i in unknown]),
+                              self.rng)
+            for i, utility in zip(unknown, results):
+                utilities[i] = utility
+        return utilities
+
+    def backup(self, path, utility):
+        """Add playout to each state of path. States of path are distinct."""
+        self.visits[path] += 1
+        self.totals[path] += utility
+
+    def get_children(self, board, actions):
+        """Return list of hash of child of each action."""
+        children = []
+        for action in actions:
+            board.push(action)
+            children.append(hash(board))
+            board.pop()
+        return children
+
+    ## Tree methods ##
+
+    def get_action_values(self, board):
+        """Return pairs of action, mean utility of child. Zero if unvisited."""
+        actions = board.get_actions()
+        children = self.get_children(board, actions)
+        visits = self.visits[children]
+        values = self.totals[children] / np.maximum(visits, 1)
+        return list(zip(actions, values))
+
+    def get_best_actions(self, board):
+        """Search from board. Return actions of most visited children."""
+        self.search(board)
+        actions = board.get_actions()
+        visits = self.visits[self.get_children(board, actions)]
+        return [actions[i] for i in np.flatnonzero(visits == visits.max())]
+
+def run_worker(tree_kwargs, stats, board, seed):
+    """Search from board on copy of stats. Return change of stats."""
+    tree = MCTSTree(seed=seed, **tree_kwargs)
+    tree.visits[:], tree.totals[:], tree.expanded[:] = stats
+    tree.search(board)
+    return tree.visits - stats[0], tree.totals - stats[1], tree.expanded
+
+class RootParallelMCTSTree(MCTSTree):
+    """
+    MCTS parallel at root. Worker processes search independently, merged.
+
+    Each search, every worker starts from current statistics with own rng
+    stream, and runs the full budget of iterations or time_limit. Their
+    playouts are summed into statistics, so best actions are chosen by
+    merged visit counts. Workers may batch leaves with virtual loss too.
+
+    Pool of worker processes starts on first search. Close ends it.
+    """
+
+    def __init__(self, iterations=1000, time_limit=None, c=1.4, batch=1,
+                 virtual_loss=1, tablebase=None, workers=2, seed=None):
+        super().__init__(iterations, time_limit, c, batch, virtual_loss,
+                         tablebase, seed)
+        self.workers = workers
+        self.pool = None
+
+    def search(self, board):
+        """Search from board in each worker. Return number of playouts."""
+        if self.pool is None:
+            self.pool = mp.get_context().Pool(self.workers)
+        tree_kwargs = {'iterations': self.iterations,
+                       'time_limit': self.time_limit, 'c': self.c,
+                       'batch': self.batch,
+                       'virtual_loss': self.virtual_loss,
+                       'tablebase': self.tablebase}
+        stats = (self.visits.copy(), self.totals.copy(), self.expanded.copy())
+        args = [(tree_kwargs, stats, board, rng)
+                for rng in self.rng.spawn(self.workers)]
+        root = self.visits[hash(board)]
+        for visits, totals, expanded in self.pool.starmap(run_worker, args):
+            self.visits += visits
+            self.totals += totals
+            self.expanded |= expanded
+        return int(self.visits[hash(board)] - root)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
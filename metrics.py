@@ -0,0 +1,79 @@
+import numpy as np
+import os
+
+class MetricsLog:
+    """
+    Append-only log of fixed shape rows, streamed to disk in chunks.
+
+    Rows are buffered and written every flush_rows rows to path + '.bin' as
+    raw values, so the file is a plain row major array that can be memory
+    mapped while the log is still written. Row shape and dtype are saved
+    once to path + '.meta.npy'. A crash loses at most the unflushed rows.
+
+    Open with append=True to continue an existing log, else it is emptied.
+    """
+
+    def __init__(self, path, shape, dtype, flush_rows=10, append=False):
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.flush_rows = flush_rows
+        self.buffer = []
+        np.save(path + '.meta.npy', {'shape': self.shape,
+                                     'dtype': self.dtype.str})
+        self.file = open(path + '.bin', 'ab' if append else 'wb')
+
+    def truncate(self, rows):
+        """Drop buffer and all rows after first rows, e.g. to checkpoint."""
+        self.buffer.clear()
+        self.file.flush()
+        row_size = self.dtype.itemsize * int(np.prod(self.shape))
+        self.file.truncate(rows * row_size)
+
+    def append(self, row):
+        """Buffer row. Write buffer to disk if full."""
+        row = np.asarray(row, dtype=self.dtype)
+        assert row.shape == self.shape, (row.shape, self.shape)
+        self.buffer.append(row)
+        if len(self.buffer) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows as one chunk, then clear buffer."""
+        if self.buffer:
+            self.file.write(np.stack(self.buffer).tobytes())
+            self.buffer.clear()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def read(self):
+        """Flush, return read only memory map of all rows."""
+        if not self.file.closed:
+            self.flush()
+        return read_log(self.path)
+
+def read_meta(path):
+    """Return (row shape, dtype) of log at path."""
+    meta = np.load(path + '.meta.npy', allow_pickle='TRUE').item()
+    return tuple(meta['shape']), np.dtype(meta['dtype'])
+
+def read_log(path):
+    """Return read only memory map of complete rows of log at path.
+
+    A partial row left by a crash mid write is ignored."""
+    shape, dtype = read_meta(path)
+    row_size = dtype.itemsize * int(np.prod(shape))
+    rows = os.path.getsize(path + '.bin') // row_size
+    if not rows:
+        return np.zeros((0,) + shape, dtype)
+    return np.memmap(path + '.bin', dtype, 'r', shape=(rows,) + shape)
+
+def iter_log(path, chunk_rows=1024):
+    """Yield arrays of up to chunk_rows rows of log at path, in order."""
+    data = read_log(path)
+    for i in range(0, len(data), chunk_rows):
+        yield np.array(data[i:i+chunk_rows])
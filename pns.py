@@ -0,0 +1,155 @@
+from tree import Tree
+from transposition import Table
+
+INF = float('inf')
+
+class PNSTree(Tree):
+    """
+    Proof number search. Solves value of any board without full enumeration.
+
+    A search proves or disproves a goal, utility of board (agent1 pov) at
+    least threshold. Agent1 nodes are OR nodes, one proved child proves
+    them. Agent2 nodes are AND nodes, all children must be proved. Each
+    node has a proof number and disproof number: least number of leaves to
+    expand to prove, disprove it. Each iteration descends from root to the
+    most proving node, by least proof number at OR nodes and least disproof
+    number at AND nodes, expands it, then recomputes numbers along the path.
+
+    Value is solved by two searches: agent1 wins (threshold 1), else agent1
+    draws (threshold 0), else agent2 wins.
+
+    Numbers are kept in a transposition table keyed by board hash, so
+    symmetric boards and transpositions are expanded once. Children are
+    found from the board at each visit, as actions of a canonical state
+    depend on orientation of board. Search gives up, value None, when table
+    holds max_nodes states.
+
+    attributes:
+        max_nodes -- bound on states in table of one search
+        numbers -- dict maps hash to [proof, disproof] of current search
+        expanded -- set of hashes expanded in current search
+        table -- Table of solved values, agent1 pov
+        tablebase -- Tablebase of known values, None for none
+    """
+
+    def __init__(self, max_nodes=100000, tablebase=None):
+        super().__init__(Table())
+        self.max_nodes = max_nodes
+        self.tablebase = tablebase
+        self.numbers = {}
+        self.expanded = set()
+
+    ## Solve methods ##
+
+    def solve(self, board):
+        """Return value of board: 1, 0, -1. None if node bound reached."""
+        value = self.table.get(board)
+        if value is not None:
+            return value
+        if board.is_terminal():
+            return board.utility()
+        value = None
+        win = self.prove(board, 1)
+        if win:
+            value = 1
+        elif win is False:
+            draw = self.prove(board, 0)
+            if draw is not None:
+                value = 0 if draw else -1
+        if value is not None:
+            self.table[board] = value
+        return value
+
+    def prove(self, board, threshold):
+        """Return True if utility of board at least threshold, else False.
+
+        None if node bound reached first."""
+        self.threshold = threshold
+        self.numbers.clear()
+        self.expanded.clear()
+        root = self.get_numbers(board)
+        while root[0] and root[1]:
+            if len(self.numbers) >= self.max_nodes:
+                return None
+            root = self.iterate(board)
+        return not root[0]
+
+    def iterate(self, board):
+        """Expand most proving node below board. Return updated numbers.
+
+        Numbers of a state reached by other parents may be stale, so they
+        are recomputed before descending, and a solved state is not."""
+        state = hash(board)
+        children = self.get_children(board)
+        if state in self.expanded:
+            numbers = self.backup(board, children)
+            if numbers[0] and numbers[1]:
+                board.push(self.select(board, children))
+                self.iterate(board)
+                board.pop()
+        else:
+            self.expanded.add(state)
+        numbers = self.numbers[state] = self.backup(board, children)
+        return numbers
+
+    def select(self, board, children):
+        """Return action to most proving child."""
+        index = 0 if board.turn() == 1 else 1
+        action, _ = min(children, key=lambda x: self.numbers[x[1]][index])
+        return action
+
+    def backup(self, board, children):
+        """Return [proof, disproof] of board from its children."""
+        proofs = [self.numbers[child][0] for _, child in children]
+        disproofs = [self.numbers[child][1] for _, child in children]
+        if board.turn() == 1:
+            return [min(proofs), sum(disproofs)]
+        return [sum(proofs), min(disproofs)]
+
+    def get_children(self, board):
+        """Return list of (action, child hash), one per child state.
+
+        Child numbers are set if not in table."""
+        children = {}
+        for action in board.get_actions():
+            board.push(action)
+            child = hash(board)
+            if child not in children:
+                children[child] = action
+                self.get_numbers(board)
+            board.pop()
+        return [(action, child) for child, action in children.items()]
+
+    def get_numbers(self, board):
+        """Return [proof, disproof] of board, set if new.
+
+        Terminal, solved and tablebase boards are proved or disproved,
+        others are (1, 1)."""
+        state = hash(board)
+        numbers = self.numbers.get(state)
+        if numbers is None:
+            value = self.table.get(board)
+            if value is None and self.tablebase is not None:
+                value = self.tablebase.probe(board)
+            if value is None and board.is_terminal():
+                value = board.utility()
+            if value is not None:
+                if value >= self.threshold:
+                    numbers = [0, INF]
+                else:
+                    numbers = [INF, 0]
+            else:
+                numbers = [1, 1]
+            self.numbers[state] = numbers
+        return numbers
+
+    ## Tree methods ##
+
+    def get_action_values(self, board):
+        """Return pairs of action, solved value of afterstate."""
+        result = []
+        for action in board.get_actions():
+            board.push(action)
+            result.append((action, self.solve(board)))
+            board.pop()
+        return result
@@ -0,0 +1,125 @@
+import heapq
+import numpy as np
+
+from graph import get_graph
+from transposition import DefaultTable
+from rl import RLSelfPlay
+
+class PSSelfPlay(RLSelfPlay):
+    """
+    Prioritized sweeping over the known game graph.
+
+    Episodes are generated as for other self-play learners, but states are
+    not updated toward the sampled return. Instead each visited state is
+    queued by its Bellman error, the absolute difference of its value and
+    the backup of its children. Each episode then performs a number of full
+    backups, largest error first. A backup changes the error of the parents,
+    which are queued in turn, so updates sweep back from the leaves.
+
+    Terminal values are known from the graph and set at start. Every state
+    is queued with its initial error, so sweeps reach all parents of leaves.
+
+    backups:
+        minimax -- max (min) of child values if turn is agent1 (agent2)
+        expectimax -- mean of child values, opponent acts at random, same
+            theory as UniformTree
+
+    attributes:
+        sweeps -- number of backups per episode
+        theta -- smallest Bellman error queued
+        backups -- total number of backups performed
+    """
+
+    def __init__(self, gamma=1, alpha=1, epsilon=1, sweeps=20, theta=1e-6,
+                 backup='minimax', values=None, visits=None, seed=None):
+        if values is None:
+            values = DefaultTable(np.zeros(765))
+        super().__init__(gamma, alpha, epsilon, values, visits, seed)
+        self.graph = get_graph()
+        terminals = self.graph.terminals
+        self.values.values[terminals] = self.graph.utilities[terminals]
+        self.sweeps = sweeps
+        self.theta = theta
+        self.backup = getattr(self, backup + '_backup')
+        self.queue = []
+        self.priorities = np.zeros(765)
+        self.backups = 0
+        for state in range(765):
+            self.queue_state(state)
+
+    ## Episode methods ##
+
+    def evaluate_episode(self):
+        """Queue states of episode by Bellman error, then sweep."""
+        self.visits[self.board] += 1
+        for _ in range(self.board.moves()):
+            self.board.pop()
+            self.visits[self.board] += 1
+            self.queue_state(hash(self.board))
+        self.sweep(self.sweeps)
+
+    def episode_delta(self):
+        """Return max absolute change in values. Don't change values."""
+        max_delta = 0
+        for _ in range(self.board.moves()):
+            self.board.pop()
+            delta = self.alpha * self.get_error(hash(self.board))
+            max_delta = max(delta, max_delta)
+        return max_delta
+
+    def get_state(self):
+        state = super().get_state()
+        state['priorities'] = self.priorities
+        state['queue'] = np.array(self.queue).reshape(-1, 2)
+        state['backups'] = self.backups
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.priorities[:] = state['priorities']
+        self.queue = [(priority, int(s)) for priority,s in state['queue']]
+        heapq.heapify(self.queue)
+        self.backups = int(state['backups'])
+
+    ## Sweep methods ##
+
+    def sweep(self, backups):
+        """Back up states with largest error. Queue parents of each."""
+        values = self.values.values
+        while backups and self.queue:
+            priority, state = heapq.heappop(self.queue)
+            if -priority != self.priorities[state]:
+                continue  # stale entry, state requeued with higher error
+            self.priorities[state] = 0
+            values[state] += self.alpha * (self.backup(state) - values[state])
+            self.backups += 1
+            backups -= 1
+            for parent in self.graph.parents[state]:
+                self.queue_state(parent)
+
+    def queue_state(self, state):
+        """Push state onto queue if error is above theta and its priority."""
+        error = self.get_error(state)
+        if error > self.theta and error > self.priorities[state]:
+            self.priorities[state] = error
+            heapq.heappush(self.queue, (-error, state))
+
+    def get_error(self, state):
+        """Return absolute Bellman error of state. Zero for terminals."""
+        if self.graph.terminals[state]:
+            return 0
+        return abs(self.backup(state) - self.values.values[state])
+
+    ## Backup methods ##
+
+    def minimax_backup(self, state):
+        """Return discounted best child value for agent to act."""
+        children = self.values.values[list(self.graph.children[state])]
+        if self.graph.turns[state] == 1:
+            return self.gamma * children.max()
+        return self.gamma * children.min()
+
+    def expectimax_backup(self, state):
+        """Return discounted mean child value."""
+        children = self.values.values[list(self.graph.children[state])]
+        return self.gamma * children.mean()
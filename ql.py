@@ -1,4 +1,4 @@
-from transposition import Set
+from graph import get_graph
 from rl import RLSelfPlay
 
 class QSelfPlay(RLSelfPlay):
@@ -19,6 +19,15 @@ class QSelfPlay(RLSelfPlay):
             delta = self.alpha * (G - self.values[self.board])
             self.values[self.board] += delta
 
+    def evaluate_states(self, states, G):
+        """Target of each state is best value of its children in graph."""
+        graph = get_graph()
+        self.values[states[-1]] = G
+        for state in reversed(states[:-1]):
+            children = [self.values[child] for child in graph.children[state]]
+            G = max(children) if graph.turns[state] == 1 else min(children)
+            self.values[state] += self.alpha * (G - self.values[state])
+
     def episode_delta(self):
         """Return max absolute change in values. Don't change values."""
         G = self.board.utility()
@@ -35,9 +44,12 @@ class QSelfPlay(RLSelfPlay):
 class QSSelfPlay(QSelfPlay):
 
     def __init__(self, gamma=1, alpha=.5, epsilon=15, depth=3, values=None,
-                 visits=None):
-        super().__init__(gamma, alpha, epsilon, values, visits)
-        self.search_tree = Set()
+                 visits=None, seed=None):
+        super().__init__(gamma, alpha, epsilon, values, visits, seed)
+        # search_tree maps (hash, depth) to memoized search value
+        # search_parents maps (hash, depth) to set of keys searched from it
+        self.search_tree = {}
+        self.search_parents = {}
         self.depth = depth
 
     def evaluate_episode(self):
@@ -51,13 +63,13 @@ class QSSelfPlay(QSelfPlay):
         This is off policy i.e. not necessarily follow actual return value."""
         G = self.board.utility()
         self.visits[self.board] += 1
-        self.values[self.board] = G
+        self.set_value(G)
         for _ in range(self.board.moves()):
             self.board.pop()
             self.visits[self.board] += 1
             G = self.get_best_value()
             delta = self.alpha * (G - self.values[self.board])
-            self.values[self.board] += delta
+            self.set_value(self.values[self.board] + delta)
 
     def episode_delta(self):
         """Return max absolute change in values. Don't change values."""
@@ -72,13 +84,57 @@ class QSSelfPlay(QSelfPlay):
 
         return max_delta
 
-    def get_best_value(self):
+    def evaluate_states(self, states, G):
+        """Search each state to depth from its board in graph.
+
+        Boards of graph are symmetric to those played, same values."""
+        graph = get_graph()
+        board = self.board
+        self.board = graph.boards[states[-1]].copy()
+        self.set_value(G)
+        for state in reversed(states[:-1]):
+            self.board = graph.boards[state].copy()
+            G = self.get_best_value()
+            delta = self.alpha * (G - self.values[self.board])
+            self.set_value(self.values[self.board] + delta)
+        self.board = board
+
+    def set_state(self, state):
+        """Restore learner. Memoized searches are of old values, drop."""
+        super().set_state(state)
         self.search_tree.clear()
+        self.search_parents.clear()
+
+    def set_value(self, value):
+        """Set value of board. Drop memoized searches that reached it."""
+        if value != self.values[self.board]:
+            self.values[self.board] = value
+            self.invalidate((hash(self.board), 0))
+
+    def invalidate(self, key):
+        """Remove search values of all ancestors of key in search tree."""
+        stack = [key]
+        while stack:
+            for parent in self.search_parents.pop(stack.pop(), ()):
+                if self.search_tree.pop(parent, None) is not None:
+                    stack.append(parent)
+
+    def get_best_value(self):
         return self.explore(self.depth)
 
-    def explore(self, depth):
-        if self.cutoff_test(depth):
+    def explore(self, depth, parent=None):
+        """Return minimax value of values to depth. Memoize by (hash, depth).
+
+        Leaves are keyed at depth 0. Each key records the parent keys
+        searched from it, so a changed leaf value invalidates only the
+        searches that depend on it."""
+        key = hash(self.board), 0 if self.cutoff_test(depth) else depth
+        if parent is not None:
+            self.search_parents.setdefault(key, set()).add(parent)
+        if not key[1]:
             return self.values[self.board]
+        if key in self.search_tree:
+            return self.search_tree[key]
 
         if self.board.turn() == 1:
             best = max
@@ -89,13 +145,13 @@ class QSSelfPlay(QSelfPlay):
 
         for action in self.board.get_actions():
             self.board.push(action)
-            child = self.explore(depth-1)
+            child = self.explore(depth-1, key)
             value = best(child, value)
             self.board.pop()
 
+        self.search_tree[key] = value
         return value
 
     def cutoff_test(self, depth):
-        """Return True if depth is 0, board already explored, or terminal."""
-        return (not depth or self.board in self.search_tree or
-                self.board.is_terminal())
+        """Return True if depth is 0 or board is terminal."""
+        return not depth or self.board.is_terminal()
@@ -0,0 +1,110 @@
+import numpy as np
+from math import comb
+
+from board import Snapshot
+from board_hash import HashTable
+
+class Ranking:
+    """
+    Dense, invertible index of positions by combinatorial ranking.
+
+    Positions are grouped by number of moves m, agent1 having played
+    ceil(m/2) cells and agent2 floor(m/2). Groups are ranked in order of m.
+    Within a group, rank is
+
+        rank of agent1 cells among all cells * C(open cells, agent2 cells)
+            + rank of agent2 cells among cells agent1 left open
+
+    Each set of cells is ranked in the combinatorial number system: sorted
+    cells c_1 < ... < c_k rank as sum of C(c_i, i). So every position with
+    legal counts of pieces has one index below size, with no table of
+    3**cells entries. Positions after a game would have ended are counted
+    too, so indices are dense over piece counts, not reachable states.
+
+    Works for any number of cells. Rank, unrank take arrays of many
+    positions at once.
+
+    attributes:
+        cells -- number of cells of board
+        binom -- array of C(n, k) for n, k up to cells
+        counts -- array of positions of each number of moves
+        offsets -- array of index of first position of each number of moves
+        size -- number of positions
+    """
+
+    def __init__(self, cells=9):
+        self.cells = cells
+        self.binom = np.array([[comb(n, k) for k in range(cells+2)]
+                               for n in range(cells+1)], dtype=np.int64)
+        moves = np.arange(cells+1)
+        self.ones, self.twos = (moves + 1) // 2, moves // 2
+        self.counts = (self.binom[cells, self.ones] *
+                       self.binom[cells - self.ones, self.twos])
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+        self.size = int(self.offsets[-1])
+
+    def __len__(self):
+        return self.size
+
+    def rank(self, values):
+        """Return array of index of each row of N x cells board values."""
+        values = np.atleast_2d(values)
+        ones, twos = values == 1, values == 2
+        moves = ones.sum(axis=1) + twos.sum(axis=1)
+        cells = np.arange(self.cells)
+        # agent1 cells ranked among all cells
+        before = np.cumsum(ones, axis=1)
+        rank_ones = (self.binom[cells, before] * ones).sum(axis=1)
+        # agent2 cells ranked among cells agent1 left open
+        compressed = cells - (before - ones)
+        rank_twos = (self.binom[compressed, np.cumsum(twos, axis=1)] *
+                     twos).sum(axis=1)
+        n1, n2 = self.ones[moves], self.twos[moves]
+        return (self.offsets[moves] +
+                rank_ones * self.binom[self.cells - n1, n2] + rank_twos)
+
+    def unrank(self, indices):
+        """Return N x cells array of board values of each index."""
+        indices = np.atleast_1d(indices)
+        moves = np.searchsorted(self.offsets, indices, 'right') - 1
+        n1, n2 = self.ones[moves], self.twos[moves]
+        rank_ones, rank_twos = np.divmod(indices - self.offsets[moves],
+                                         self.binom[self.cells - n1, n2])
+        ones = self.decode(rank_ones, n1)
+        twos = self.decode(rank_twos, n2)
+        values = np.zeros((len(indices), self.cells), int)
+        values[ones] = 1
+        # place agent2 cells at compressed positions of open cells
+        open_cells = np.argsort(ones, axis=1, kind='stable')
+        rows = np.arange(len(indices))[:, None]
+        placed = np.zeros_like(ones)
+        placed[rows, open_cells] = twos
+        values[placed & ~ones] = 2
+        return values
+
+    def decode(self, ranks, sizes):
+        """Return N x cells boolean array of combinations of ranks, sizes.
+
+        Greedy from largest cell: cell c is in combination if C(c, k) is at
+        most rest of rank, k cells left to place."""
+        ranks, sizes = ranks.copy(), sizes.copy()
+        result = np.zeros((len(ranks), self.cells), bool)
+        for c in range(self.cells - 1, -1, -1):
+            take = (sizes > 0) & (self.binom[c, sizes] <= ranks)
+            result[take, c] = True
+            ranks[take] -= self.binom[c, sizes[take]]
+            sizes[take] -= 1
+        return result
+
+RANKING = Ranking()
+
+def to_board(values):
+    """Return Board of 3x3 values. Keys played alternately in key order.
+
+    None if position is not reachable, since play would have ended."""
+    hash_value = int(HashTable.hash_keys[values, np.arange(9)].sum())
+    if HashTable.hash_values[hash_value] == 1024:
+        return None
+    keys = np.flatnonzero(values)
+    bits = int(np.sum(1 << (keys + 9*values[keys] - 9)))
+    return Snapshot(bits).to_board()
@@ -0,0 +1,94 @@
+import numpy as np
+
+from board import HASH_KEYS, HASH_VALUES
+
+STATES_ROW = 11 # state of each move, root first, -1 padded, then utility
+
+def encode_states(board):
+    """Return row of states of terminal board from root, -1 padded, utility.
+
+    States are canonical hashes of board after each move of played keys.
+    Rows of actor.encode_episode keep the keys themselves, to replay onto
+    a board."""
+    row = np.full(STATES_ROW, -1, np.int16)
+    hash_value = 0
+    row[0] = HASH_VALUES[hash_value]
+    for i, key in enumerate(board.played_keys):
+        hash_value += HASH_KEYS[1 + i%2][key]
+        row[i+1] = HASH_VALUES[hash_value]
+    row[-1] = board.utility()
+    return row
+
+def decode_states(row):
+    """Return list of states of row, root first, and utility."""
+    states = row[:-1]
+    return states[states >= 0].tolist(), int(row[-1])
+
+class ReplayBuffer:
+    """
+    Ring buffer of self-play episodes for experience replay.
+
+    Each episode is a row of int16: canonical state after each move, then
+    utility, so 22 bytes an episode. When full, a new episode replaces the
+    oldest. Rows are sampled uniformly, with replacement.
+
+    Replay re-evaluates sampled episodes with the learner's update rule on
+    state ids, learner.evaluate_states. Tables are indexed by hash, and a
+    state id is its own hash, so updates act on the same tables as episodes
+    played on the board. Generated games are reused many times, learning
+    updates are no longer tied to generation.
+
+    attributes:
+        capacity -- most episodes kept
+        rows -- capacity x STATES_ROW array of episodes
+        count -- number of episodes added
+        rng -- numpy Generator for sampling
+    """
+
+    def __init__(self, capacity=10000, seed=None):
+        self.capacity = capacity
+        self.rows = np.full((capacity, STATES_ROW), -1, np.int16)
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def add(self, board):
+        """Add episode of terminal board."""
+        self.rows[self.count % self.capacity] = encode_states(board)
+        self.count += 1
+
+    def sample(self, n):
+        """Return n x STATES_ROW array of rows sampled uniformly."""
+        return self.rows[self.rng.integers(len(self), size=n)]
+
+    def recent(self, n):
+        """Return up to n x STATES_ROW array of newest rows, newest last."""
+        n = min(n, len(self))
+        indices = np.arange(self.count - n, self.count) % self.capacity
+        return self.rows[indices]
+
+    def replay(self, learner, n):
+        """Re-evaluate n sampled episodes with learner's update rule.
+
+        Learners without evaluate_states, as TS and PS, raise ValueError."""
+        if not learner.replays():
+            raise ValueError('%s does not replay episodes'
+                             % type(learner).__name__)
+        for row in self.sample(n):
+            learner.evaluate_states(*decode_states(row))
+
+    ## Save methods ##
+
+    def get_state(self):
+        """Return dict of arrays that restores buffer: rows, count, rng."""
+        return {'rows': self.rows, 'count': np.array(self.count),
+                'rng': np.array(self.rng.bit_generator.state, dtype=object)}
+
+    def set_state(self, state):
+        """Restore buffer from dict of get_state, capacity too."""
+        self.rows = np.array(state['rows'], np.int16)
+        self.capacity = len(self.rows)
+        self.count = int(state['count'])
+        self.rng.bit_generator.state = state['rng'].item()
@@ -1,18 +1,35 @@
 import numpy as np
 import os
 
-from board import Board
+from board import Board, HASH_KEYS, HASH_VALUES
 from tree import Tree
-from transposition import Table, DefaultTable
+from replay import ReplayBuffer
+from transposition import Table, DefaultTable, DEFAULT
 
 DATA_PATH = os.getcwd() + '/data/'
 
-def get_random_value():
-    return np.random.random() * np.random.choice((-1,1))
+RANDOM_BATCH = 1024
 
-class RLSelfPlay:
+def get_random_value(rng):
+    return rng.random() * rng.choice((-1,1))
 
-    def __init__(self, gamma=1, alpha=.5, epsilon=1, values=None, visits=None):
+class RLSelfPlay:
+    """
+    Self-play learner. One agent plays both sides, learns table of values.
+
+    Each instance owns a numpy Generator, seeded by seed (int, SeedSequence
+    or None for fresh entropy). Spawn seeds for parallel learners from one
+    SeedSequence, so streams are independent and reproducible. Uniform
+    numbers are drawn from the generator in batches of RANDOM_BATCH, then
+    used one at a time for epsilon tests and random choices. A policy step
+    takes one number: it decides exploration, then picks the action.
+
+    With a ReplayBuffer as replay, each generated episode is added to it
+    before evaluation. Evaluate_states re-evaluates an episode of replay.
+    """
+
+    def __init__(self, gamma=1, alpha=.5, epsilon=1, values=None, visits=None,
+                 seed=None):
         self.gamma = gamma
         self.alpha = alpha
         self.epsilon = epsilon
@@ -23,6 +40,10 @@ class RLSelfPlay:
             visits = DefaultTable()
         self.visits = visits
         self.board = Board()
+        self.rng = np.random.default_rng(seed)
+        self.randoms = []
+        self.random_index = 0
+        self._replay = None
 
     ## Run methods ##
 
@@ -33,6 +54,8 @@ class RLSelfPlay:
 
     def run_episode(self):
         self.generate_episode()
+        if self.replay is not None:
+            self.replay.add(self.board)
         self.evaluate_episode()
 
     def get_episode_delta(self):
@@ -40,6 +63,24 @@ class RLSelfPlay:
         self.generate_episode(greedy=True)
         return self.episode_delta()
 
+    @property
+    def replay(self):
+        return self._replay
+
+    @replay.setter
+    def replay(self, replay):
+        """Set ReplayBuffer of generated episodes, None for none."""
+        if replay is not None and not self.replays():
+            raise ValueError('%s does not replay episodes'
+                             % type(self).__name__)
+        self._replay = replay
+
+    def replays(self):
+        """Return True if learner adds and evaluates episodes of replay."""
+        cls = type(self)
+        return (cls.evaluate_states is not RLSelfPlay.evaluate_states and
+                cls.run_episode is RLSelfPlay.run_episode)
+
     ## Episode methods ##
 
     def generate_episode(self, greedy=False):
@@ -52,6 +93,12 @@ class RLSelfPlay:
     def evaluate_episode(self):
         """Backup state rewards according to particular rl algorithm."""
 
+    def evaluate_states(self, states, G):
+        """Backup rewards of episode of states, root first, utility G.
+
+        Same update as evaluate_episode on state ids. Replays are not new
+        visits, visits are unchanged."""
+
     def evaluate_episode_delta(self):
         """Backup state rewards, return max absolute change in values."""
 
@@ -61,44 +108,78 @@ class RLSelfPlay:
     ## Policy methods ##
 
     def policy(self, greedy=False):
-        if not greedy and not self.epsilon_greedy():
-            action = self.random_policy()
-        else:
-            action = self.greedy_policy()
-        return action
-
-    def random_policy(self):
+        """Return epsilon greedy action of one uniform draw u.
+
+        Explore if u below exploration prob e, u / e is then uniform and
+        picks random action. Else (u - e) / (1 - e) is uniform and picks
+        one of best actions."""
+        u = self.random()
+        e = 0 if greedy else self.get_epsilon()
+        if u < e:
+            return self.random_policy(u / e)
+        return self.greedy_policy((u - e) / (1 - e))
+
+    def random_policy(self, u=None):
         """Return random choice of actions."""
-        return np.random.choice(self.board.get_actions())
+        return self.choice(self.board.get_actions(), u)
 
-    def greedy_policy(self):
+    def greedy_policy(self, u=None):
         """Return random choice of best actions."""
-        return np.random.choice(self.get_best_actions())
+        return self.choice(self.get_best_actions(), u)
 
-    def epsilon_greedy(self):
-        """Return True with prob epsilon -- function of attr, visits.
+    def get_epsilon(self):
+        """Return prob of random action -- function of attr, visits.
 
         Define epsilon as a function of self.epsilon and number visits to
         current state. Satisfies GLIE with linear decay of exploration (random
         action) but greedy as visits approach infinity.
         """
-        e = self.epsilon / (self.epsilon + self.visits[self.board])
-        return np.random.random() >= e
+        return self.epsilon / (self.epsilon + self.visits[self.board])
+
+    ## Random methods ##
+
+    def random(self):
+        """Return next uniform float in [0, 1) of pre-drawn batch."""
+        if self.random_index == len(self.randoms):
+            self.randoms = self.rng.random(RANDOM_BATCH).tolist()
+            self.random_index = 0
+        self.random_index += 1
+        return self.randoms[self.random_index-1]
+
+    def choice(self, items, u=None):
+        """Return uniformly random item of sequence, picked by u if given."""
+        if u is None:
+            u = self.random()
+        return items[min(int(u * len(items)), len(items) - 1)]
 
     ## Search methods ##
 
+    def get_child_values(self, actions):
+        """Return list of afterstate value of each action.
+
+        Afterstate hashes come from hash keys, no push or pop, and values
+        are gathered from the table array at once. Missing values are set
+        to zero, as DefaultTable does."""
+        keys = HASH_KEYS[self.board.turn()]
+        hash_value = self.board.hash_value
+        children = [HASH_VALUES[hash_value + keys[action]]
+                    for action in actions]
+        values = self.values.values[children]
+        missing = values == DEFAULT
+        if missing.any():
+            values[missing] = 0
+            self.values.values[children] = values
+        return values.tolist()
+
     def get_best_items(self):
         """Return tuple: list actions with best afterstate, value itself."""
-        items = []
+        actions = self.board.get_actions()
+        values = self.get_child_values(actions)
         best = max if self.board.turn() == 1 else min
 
-        for action in self.board.get_actions():
-            self.board.push(action)
-            items.append((action, self.values[self.board]))
-            self.board.pop()
-
-        best_value = best(items, key=lambda x: x[1])[1]
-        best_actions = [act for act,val in items if val == best_value]
+        best_value = best(values)
+        best_actions = [act for act,val in zip(actions, values)
+                        if val == best_value]
 
         return best_actions, best_value
 
@@ -137,6 +218,33 @@ class RLSelfPlay:
     def get_values(self):
         return self.values.values
 
+    def get_state(self):
+        """Return dict of arrays that restores learner: tables, rng.
+
+        Epsilon schedule is a function of visits, so visits restore its
+        position. Replay buffer is saved under keys prefixed replay_."""
+        state = {'values': self.values.values, 'visits': self.visits.values,
+                 'rng': np.array(self.rng.bit_generator.state, dtype=object),
+                 'randoms': np.array(self.randoms[self.random_index:])}
+        if self.replay is not None:
+            for key, value in self.replay.get_state().items():
+                state['replay_' + key] = value
+        return state
+
+    def set_state(self, state):
+        """Restore learner from dict of get_state. Set replay if saved."""
+        self.values.values[:] = state['values']
+        self.visits.values[:] = state['visits']
+        self.rng.bit_generator.state = state['rng'].item()
+        self.randoms = state['randoms'].tolist()
+        self.random_index = 0
+        replay = {key[7:]: value for key, value in state.items()
+                  if key.startswith('replay_')}
+        if replay:
+            if self.replay is None:
+                self.replay = ReplayBuffer()
+            self.replay.set_state(replay)
+
 class RLSelfPlayTree(Tree):
 
     def change_values(self, values):
@@ -175,6 +283,12 @@ class MCSelfPlay(RLSelfPlay):
             self.values[self.board] += delta
             G *= self.gamma
 
+    def evaluate_states(self, states, G):
+        self.values[states[-1]] = G
+        for state in reversed(states[:-1]):
+            self.values[state] += self.alpha * (G - self.values[state])
+            G *= self.gamma
+
     def episode_delta(self):
         """Return max absolute change in values. Don't change values."""
         G = self.board.utility()
@@ -206,6 +320,12 @@ class TDSelfPlay(RLSelfPlay):
             # reward is 0 for non leaf nodes
             G = self.gamma * self.values[self.board]
 
+    def evaluate_states(self, states, G):
+        self.values[states[-1]] = G
+        for state in reversed(states[:-1]):
+            self.values[state] += self.alpha * (G - self.values[state])
+            G = self.gamma * self.values[state]
+
     def episode_delta(self):
         """Return max absolute change in values. Don't change values."""
         G = self.board.utility()
@@ -222,8 +342,8 @@ class TDSelfPlay(RLSelfPlay):
 class TDLSelfPlay(RLSelfPlay):
 
     def __init__(self, gamma=1, alpha=.5, epsilon=1, lambda_=.5,
-                 values=None, visits=None):
-        super().__init__(gamma, alpha, epsilon, values, visits)
+                 values=None, visits=None, seed=None):
+        super().__init__(gamma, alpha, epsilon, values, visits, seed)
         self.lambda_ = lambda_
 
     def evaluate_episode(self):
@@ -246,6 +366,13 @@ class TDLSelfPlay(RLSelfPlay):
             G = (1 - self.lambda_) * self.values[self.board] + self.lambda_*G
             G *= self.gamma
 
+    def evaluate_states(self, states, G):
+        self.values[states[-1]] = G
+        for state in reversed(states[:-1]):
+            self.values[state] += self.alpha * (G - self.values[state])
+            G = (1 - self.lambda_) * self.values[state] + self.lambda_*G
+            G *= self.gamma
+
     def episode_delta(self):
         """Return max absolute change in values. Don't change values."""
         G = self.board.utility()
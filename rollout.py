@@ -0,0 +1,66 @@
+import numpy as np
+
+from board_hash import HashTable
+from transposition import DEFAULT
+
+KEYS = np.arange(9)
+
+# utility of win value: draw, agent1 win, agent2 win
+UTILITIES = np.array([0, 1, -1])
+
+def from_boards(boards):
+    """Return N x 9 array of values of list of Board."""
+    return np.array([board.values for board in boards])
+
+def get_hash_values(boards):
+    """Return array of hash value of each row of N x 9 board values.
+
+    Hash value of board is sum of hash keys of its (agent, key) pairs."""
+    return HashTable.hash_keys[boards, KEYS].sum(axis=1, dtype=int)
+
+def get_states(boards):
+    """Return array of hash of each row of N x 9 board values."""
+    return HashTable.hash_values[get_hash_values(boards)].astype(int)
+
+def rollout(boards, rng, values=None, epsilon=0):
+    """Play each board to end. Return array of utility of each, agent1 pov.
+
+    Boards are N x 9 array of values, as Board.values, and are not changed.
+    All unfinished boards advance one move per vectorized step, so a batch
+    takes at most nine steps.
+
+    With values None, play random. Else play greedy on values: array of
+    765 afterstate values by hash, agent1 pov, missing values count as
+    zero. With prob epsilon a move is random. Ties are random.
+    """
+    boards = np.array(boards, dtype=int)
+    raw = get_hash_values(boards)
+    winners = HashTable.win_values[HashTable.hash_values[raw]].astype(int)
+    moves = np.count_nonzero(boards, axis=1)
+    if values is not None:
+        values = np.where(values == DEFAULT, 0, values)
+    active = np.flatnonzero(winners == 3)
+    while len(active):
+        turns = 1 + moves[active] % 2
+        is_open = boards[active] == 0
+        scores = rng.random(is_open.shape)
+        if values is not None:
+            children = raw[active, None] + HashTable.hash_keys[turns]
+            afterstates = HashTable.hash_values[np.where(is_open, children,
+                                                         0)]
+            child_values = np.where(turns == 1, 1, -1)[:, None] * (
+                values[afterstates])
+            child_values[~is_open] = -np.inf
+            best = child_values == child_values.max(axis=1, keepdims=True)
+            greedy = rng.random(len(active)) >= epsilon
+            is_open[greedy] = best[greedy]
+        scores[~is_open] = -1
+        keys = scores.argmax(axis=1)
+
+        boards[active, keys] = turns
+        raw[active] += HashTable.hash_keys[turns, keys]
+        moves[active] += 1
+        winners[active] = HashTable.win_values[HashTable.hash_values[
+            raw[active]]]
+        active = active[winners[active] == 3]
+    return UTILITIES[winners]
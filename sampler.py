@@ -0,0 +1,51 @@
+import os
+import signal
+from collections import Counter
+
+class SamplingProfiler:
+    """
+    Sample call stack on a CPU timer, count stacks in flamegraph format.
+
+    Every interval seconds of CPU time, SIGPROF interrupts the process and
+    the current stack is recorded as a ';' joined line of frames, root
+    first. The current phase name, if set, is the root frame so samples can
+    be split by phase of a run. Saved lines are 'stack count', the collapsed
+    format read by flamegraph.pl and speedscope.
+
+    Unix only, main thread only.
+
+    attributes:
+        interval -- seconds of CPU time between samples
+        phase -- name prefixed to sampled stacks, None for no prefix
+        samples -- Counter maps stack str to number of samples
+    """
+
+    def __init__(self, interval=.001):
+        self.interval = interval
+        self.phase = None
+        self.samples = Counter()
+
+    def start(self):
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def sample(self, signum, frame):
+        """Signal handler. Count stack of interrupted frame."""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append('%s:%s' % (os.path.basename(code.co_filename),
+                                    code.co_name))
+            frame = frame.f_back
+        if self.phase is not None:
+            stack.append(self.phase)
+        self.samples[';'.join(reversed(stack))] += 1
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write('%s %d\n' % (stack, count))
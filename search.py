@@ -1,14 +1,19 @@
 import numpy as np
 
 class Search:
-    """Generic class for searches. Agent queries policy for action."""
+    """Generic class for searches. Agent queries policy for action.
 
-    def __init__(self, *args):
+    Ties between best actions are broken by own numpy Generator, seeded by
+    seed (int, SeedSequence or None for fresh entropy)."""
+
+    def __init__(self, *args, seed=None):
         """Analyze game board. Get utility of each action. Choose best."""
+        self.rng = np.random.default_rng(seed)
 
     def policy(self, game):
         """Return legal action for agent to take during current game step."""
-        return np.random.choice(self.get_best_actions(game.board))
+        actions = self.get_best_actions(game.board)
+        return actions[self.rng.integers(len(actions))]
 
     def get_best_actions(self, board):
         """Return most valued actions."""
@@ -37,9 +42,9 @@ class RandomSearch(Search):
 class TreeSearch(Search):
     """Search complete game tree map."""
 
-    def __init__(self, tree):
+    def __init__(self, tree, seed=None):
         self.tree = tree
-        super().__init__()
+        super().__init__(seed=seed)
 
     def get_best_actions(self, board):
         """Query tree."""
@@ -0,0 +1,133 @@
+FIELDS = ('calls', 'nodes', 'interior', 'children', 'hits', 'misses',
+          'max_depth')
+CUTOFFS = ('depth', 'terminal', 'transposition', 'alpha', 'beta')
+
+def instrument(cls):
+    """Return subclass of search cls that counts work into stats attribute.
+
+    Search cls recurses with explore over self.board, and calls cutoff_test
+    once per node. MinimaxTree, NegaminTree, QSSelfPlay, TSSelfPlay and
+    TSABSelfPlay qualify. Only the subclass is instrumented, so cls itself
+    runs at full speed.
+
+        MinimaxTree()                      -- no instrumentation
+        tree = instrument(MinimaxTree)()   -- tree.stats counts search
+    """
+
+    class Instrumented(cls):
+
+        def __init__(self, *args, **kwargs):
+            self.stats = SearchStats()
+            super().__init__(*args, **kwargs)
+
+        def explore(self, *args, **kwargs):
+            return self.stats.explore(super().explore, self.board, args,
+                                      kwargs)
+
+        def cutoff_test(self, *args):
+            result = super().cutoff_test(*args)
+            if result:
+                self.stats.cutoff(self.board, args)
+            return result
+
+    Instrumented.__name__ = Instrumented.__qualname__ = cls.__name__
+    return Instrumented
+
+class SearchStats:
+    """
+    Counts work done by one search call, and totals over all calls.
+
+    A search call is a top level call of explore. Attributes count the last
+    call, total dict sums over all calls.
+
+    attributes:
+        nodes -- number of explore calls
+        interior -- nodes with at least one child explored
+        children -- child nodes explored from interior nodes
+        hits -- nodes settled by transposition or memoized value
+        misses -- nodes expanded because no stored value settled them
+        max_depth -- deepest ply below root reached
+        cutoffs -- dict maps cutoff type to count
+            depth -- depth limit reached
+            terminal -- board is terminal
+            transposition -- board settled in cutoff_test by stored value
+            alpha, beta -- min (max) node left actions unexplored
+        total -- dict of sums of each attribute over calls, max of max_depth
+    """
+
+    def __init__(self):
+        self.total = dict.fromkeys(FIELDS + CUTOFFS, 0)
+        self.frames = []
+        self.reset()
+
+    def reset(self):
+        """Set counts of current call to zero."""
+        self.nodes = self.interior = self.children = 0
+        self.hits = self.misses = self.max_depth = 0
+        self.cutoffs = dict.fromkeys(CUTOFFS, 0)
+
+    def branching(self):
+        """Return effective branching factor: children per interior node."""
+        return self.children / self.interior if self.interior else 0
+
+    def explore(self, explore, board, args, kwargs):
+        """Call explore at node of board. Count node, its children."""
+        if self.frames:
+            self.frames[-1][0] += 1
+        else:
+            self.reset()
+        self.nodes += 1
+        self.max_depth = max(len(self.frames), self.max_depth)
+        actions = 0 if board.is_terminal() else len(board.open_keys)
+
+        frame = [0, False] # children explored, cutoff test passed
+        self.frames.append(frame)
+        try:
+            value = explore(*args, **kwargs)
+        finally:
+            self.frames.pop()
+
+        children, cut = frame
+        if children:
+            self.interior += 1
+            self.children += children
+            self.misses += 1
+            if children < actions:
+                self.cutoffs['beta' if board.turn() == 1 else 'alpha'] += 1
+        elif not cut:
+            self.hits += 1 # explore returned stored value
+
+        if not self.frames:
+            self.add_total()
+        return value
+
+    def cutoff(self, board, args):
+        """Count type of cutoff test that ended node."""
+        self.frames[-1][1] = True
+        if args and not args[0]:
+            self.cutoffs['depth'] += 1
+        elif board.is_terminal():
+            self.cutoffs['terminal'] += 1
+        else:
+            self.cutoffs['transposition'] += 1
+            self.hits += 1
+
+    def add_total(self):
+        """Add counts of finished call to total."""
+        total = self.total
+        total['calls'] += 1
+        for field in FIELDS[1:-1]:
+            total[field] += getattr(self, field)
+        total['max_depth'] = max(self.max_depth, total['max_depth'])
+        for field in CUTOFFS:
+            total[field] += self.cutoffs[field]
+
+    def get_stats(self):
+        """Return dict of counts of last call and branching factor."""
+        result = {field: getattr(self, field) for field in FIELDS[1:]}
+        result.update(self.cutoffs)
+        result['branching'] = self.branching()
+        return result
+
+    def __repr__(self):
+        return ' '.join('%s=%s' % item for item in self.get_stats().items())
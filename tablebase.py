@@ -0,0 +1,85 @@
+import numpy as np
+import os
+
+from graph import get_graph
+
+DATA_PATH = os.getcwd() + '/data/'
+
+class Tablebase:
+    """
+    Endgame tablebase: exact value of every state with at most empty cells.
+
+    Generated retrograde, level by level from the leaves: terminal states
+    take their utility, others the max (min) of their children if agent1
+    (agent2) is to act. Children of a state have one more move, so each
+    level is solved from the level before.
+
+    Stored compactly as sorted state hashes and int8 values. Probe looks up
+    row of board hash in an index array, so a search can replace any deep
+    endgame subtree by one lookup.
+
+    attributes:
+        empty -- most empty cells of a state in tablebase
+        states -- sorted array of hashes of states in tablebase
+        values -- int8 array of value of each state, agent1 pov
+        index -- array maps hash to row of states, -1 if not in tablebase
+    """
+
+    def __init__(self, empty=4, states=None, values=None):
+        self.empty = empty
+        if states is None:
+            states, values = self.generate(empty)
+        self.states = states
+        self.values = values
+        self.index = np.full(765, -1)
+        self.index[states] = np.arange(len(states))
+
+    @staticmethod
+    def generate(empty):
+        """Return arrays of states, values of states with at most empty."""
+        graph = get_graph()
+        values = np.zeros(765, np.int8)
+        for level in graph.levels:
+            if len(level) and 9 - graph.moves[level[0]] > empty:
+                break
+            for state in level:
+                if graph.terminals[state]:
+                    values[state] = graph.utilities[state]
+                    continue
+                children = values[list(graph.children[state])]
+                if graph.turns[state] == 1:
+                    values[state] = children.max()
+                else:
+                    values[state] = children.min()
+        states = np.flatnonzero(9 - graph.moves <= empty)
+        return states.astype(np.uint16), values[states]
+
+    def probe(self, board):
+        """Return value of board, agent1 pov. None if not in tablebase."""
+        row = self.index[hash(board)]
+        if row < 0:
+            return None
+        return int(self.values[row])
+
+    def __contains__(self, board):
+        return self.index[hash(board)] >= 0
+
+    def __len__(self):
+        return len(self.states)
+
+    ## Save methods ##
+
+    def save(self):
+        np.savez(DATA_PATH + 'tablebase_%d.npz' % self.empty,
+                 states=self.states, values=self.values)
+
+    @classmethod
+    def load(cls, empty=4):
+        """Return tablebase saved for empty, else generate and save."""
+        try:
+            with np.load(DATA_PATH + 'tablebase_%d.npz' % empty) as data:
+                return cls(empty, data['states'], data['values'])
+        except FileNotFoundError:
+            tablebase = cls(empty)
+            tablebase.save()
+            return tablebase
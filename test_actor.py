@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from actor import ActorLearner, EpisodeQueue, encode_episode, decode_episode
+from board import Board
+from rl import MCSelfPlay
+from ts import TSSelfPlay
+
+class FailingSelfPlay(MCSelfPlay):
+
+    def generate_episode(self, greedy=False):
+        raise ValueError('actor failed')
+
+class TestActorLearner(unittest.TestCase):
+
+    def test_queue(self):
+        """Rows come out of ring buffer in order, across wrap around."""
+        queue = EpisodeQueue(capacity=3)
+        board = Board()
+        for key in (4, 0, 2, 6, 3, 5, 1, 7, 8):
+            board.push(key)
+        row = encode_episode(board)
+        try:
+            for i in range(7):
+                self.assertTrue(queue.put(row + i))
+                np.testing.assert_array_equal(queue.get(), row + i)
+            self.assertIsNone(queue.get(timeout=.01))
+        finally:
+            queue.close()
+        replay = Board()
+        decode_episode(row, replay)
+        self.assertEqual(replay.played_keys, board.played_keys)
+
+    def test_run(self):
+        """Learner evaluates every episode streamed by actors."""
+        al = ActorLearner(MCSelfPlay, actors=2, publish=10, seed=0)
+        try:
+            al.run(200)
+        finally:
+            al.close()
+        self.assertEqual(al.episodes, 200)
+        self.assertEqual(al.rl.visits.values[0], 200) # empty board
+        self.assertEqual(al.rl.board.moves(), 0)
+
+    def test_failures(self):
+        """Unsupported learners are refused, a dead actor raises."""
+        with self.assertRaises(ValueError):
+            ActorLearner(TSSelfPlay)
+        al = ActorLearner(FailingSelfPlay, actors=1)
+        try:
+            with self.assertRaises(RuntimeError):
+                al.run(5)
+        finally:
+            al.close()
+
+if __name__ == '__main__':
+    unittest.main()
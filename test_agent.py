@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+
+import transposition
+from agent import Spawn
+from game import Game
+from search import TreeSearch
+from minimax import MinimaxTree
+from rl import RLSelfPlayTree
+
+class TestSpawn(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.data_path = transposition.DATA_PATH
+        transposition.DATA_PATH = self.dir.name + '/'
+
+    def tearDown(self):
+        transposition.DATA_PATH = self.data_path
+        self.dir.cleanup()
+        for name in ('test_minimax', 'test_rl'):
+            if name in Spawn.names:
+                Spawn.names.remove(name)
+            Spawn.lazy.discard(name)
+            for attr in (Spawn.searches, Spawn.trees, Spawn.tree_kwargs):
+                attr.pop(name, None)
+
+    def test_lazy(self):
+        """Tree is built on first agent, saved, then shared."""
+        Spawn.add_agent('test_minimax', TreeSearch, MinimaxTree, {}, True)
+        self.assertIs(Spawn.trees['test_minimax'], MinimaxTree)
+        agent = Spawn.get_agent('test_minimax')
+        other = Spawn.get_agent('test_minimax')
+        self.assertIs(agent.search.tree, other.search.tree)
+        table = transposition.Table()
+        self.assertTrue(table.load_values('test_minimax'))
+
+    def test_missing(self):
+        """Missing RL values raise on get_agent, not on add_agent."""
+        Spawn.add_agent('test_rl', TreeSearch, RLSelfPlayTree, {}, True)
+        with self.assertRaises(FileNotFoundError):
+            Spawn.get_agent('test_rl')
+
+    def test_seed(self):
+        """Agents of equal seed play equal games, mcts rollouts too."""
+        games, visits = [], []
+        for _ in range(2):
+            agent = Spawn.get_agent('mcts', seed=3)
+            game = Game(agent1=agent, agent2=agent)
+            game.run()
+            games.append(game.board.played_keys)
+            visits.append(agent.search.tree.visits)
+        self.assertEqual(games[0], games[1])
+        self.assertEqual(visits[0].tolist(), visits[1].tolist())
+
+if __name__ == '__main__':
+    unittest.main()
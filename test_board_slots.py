@@ -0,0 +1,43 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from board import Board
+from graph import get_graph
+
+class TestBoardSlots(unittest.TestCase):
+
+    def test_push_pop(self):
+        """Pop undoes push: keys, hash, winner and values view."""
+        board = Board()
+        values = board.values
+        keys = (4, 0, 2, 6, 3, 5, 1, 7, 8)
+        for i, key in enumerate(keys):
+            board.push(key)
+            self.assertEqual(board.played_keys, list(keys[:i+1]))
+            self.assertEqual(board.last_key(), key)
+            self.assertEqual(values[key], board.other())
+            self.assertNotIn(key, board.get_actions())
+        self.assertEqual(board.winner, 0)
+        for key in reversed(keys):
+            self.assertEqual(board.pop(), key)
+        self.assertEqual(board.hash_value, 0)
+        self.assertIsNone(board.last_key())
+        self.assertFalse(values.any())
+        self.assertEqual(board.open_keys, set(range(9)))
+
+    def test_copy(self):
+        """Copies and pickles are independent and equal."""
+        for board in get_graph().boards:
+            for other in (board.copy(), pickle.loads(pickle.dumps(board))):
+                self.assertEqual(hash(other), hash(board))
+                self.assertEqual(other.played_keys, board.played_keys)
+                self.assertEqual(other.winner, board.winner)
+                np.testing.assert_array_equal(other.values, board.values)
+                if not other.is_terminal():
+                    other.push(other.get_actions()[0])
+                    self.assertNotEqual(other.moves(), board.moves())
+
+if __name__ == '__main__':
+    unittest.main()
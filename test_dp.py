@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+
+from board import Board
+from dp import (UniformTree, DiscountTree, IncrementalDiscountTree,
+                get_discount_values)
+
+class TestIncrementalDiscountTree(unittest.TestCase):
+
+    def test_values(self):
+        gammas = (1, .9, .5)
+        batch = get_discount_values(gammas)
+        np.testing.assert_allclose(batch[0], UniformTree().table.values,
+                                   atol=1e-12)
+        tree = IncrementalDiscountTree()
+        for gamma, values in zip(gammas, batch):
+            expected = DiscountTree(gamma=gamma).table.values
+            np.testing.assert_allclose(values, expected, atol=1e-12)
+            tree.set_gamma(gamma)
+            np.testing.assert_allclose(tree.table.values, expected,
+                                       atol=1e-12)
+
+    def test_set_utility(self):
+        tree = IncrementalDiscountTree()
+        board = Board()
+        for key in (0, 3, 1, 4, 2):
+            board.push(key)
+        tree.set_utility(board, .5)
+        self.assertEqual(tree.table[board], .5)
+        expected = get_discount_values(tree.gamma, tree.utilities)[0]
+        np.testing.assert_allclose(tree.table.values, expected, atol=1e-12)
+        self.assertNotAlmostEqual(tree.table[Board()],
+                                  DiscountTree().table[Board()])
+
+if __name__ == '__main__':
+    unittest.main()
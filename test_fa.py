@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from board import Board
+from features import Features, LineFeatures
+from fa import LinearTable, TDLFASelfPlay, TSFASelfPlay
+
+class TestLinearTable(unittest.TestCase):
+
+    def test_symmetric_features(self):
+        # corner openings are symmetric, so features must be equal
+        for features in (Features, LineFeatures):
+            result = set()
+            for key in (0, 2, 6, 8):
+                board = Board()
+                board.push(key)
+                board.push(4)
+                result.add(tuple(features.get_features(board)))
+            self.assertEqual(len(result), 1)
+
+    def test_terminal_values(self):
+        table = LinearTable(LineFeatures)
+        board = Board()
+        for key in (0, 3, 1, 4, 2):
+            board.push(key)
+        self.assertEqual(table[board], 1)
+        table.weights[:] = 1
+        table.refresh()
+        self.assertEqual(table[board], 1)
+
+    def test_update(self):
+        table = LinearTable(LineFeatures)
+        board = Board()
+        board.push(4)
+        for _ in range(50):
+            table.add_target(board, .5)
+            table.update(.5)
+        self.assertAlmostEqual(table[board], .5)
+
+    def test_run(self):
+        for rl in (TDLFASelfPlay(), TSFASelfPlay(features=LineFeatures)):
+            rl.run(20)
+            self.assertEqual(rl.get_values().shape, (765,))
+            self.assertTrue(np.isfinite(rl.get_values()).all())
+
+    def test_episode_delta(self):
+        """Delta episodes leave values and queued targets unchanged."""
+        for rl in (TDLFASelfPlay(batch=3, seed=0),
+                   TSFASelfPlay(features=LineFeatures, seed=0)):
+            rl.run(4)
+            values = rl.get_values().copy()
+            ids, targets = list(rl.values.batch_ids), list(
+                rl.values.batch_targets)
+            rl.get_episode_delta()
+            np.testing.assert_array_equal(rl.get_values(), values)
+            self.assertEqual(rl.values.batch_ids, ids)
+            self.assertEqual(rl.values.batch_targets, targets)
+
+    def test_state(self):
+        """Restored learner keeps queued targets, continues the same."""
+        a = TDLFASelfPlay(batch=3, seed=1)
+        a.run(4)
+        self.assertTrue(a.values.batch_ids)
+        b = TDLFASelfPlay(batch=3)
+        b.set_state(a.get_state())
+        a.run(5)
+        b.run(5)
+        np.testing.assert_array_equal(a.get_values(), b.get_values())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from board import Board
+from game import Game
+from agent import Spawn
+from search import TreeSearch
+from mcts import MCTSTree, RootParallelMCTSTree
+
+class TestMCTSTree(unittest.TestCase):
+
+    def test_win(self):
+        """Search finds win in one, and block of loss in one."""
+        tree = MCTSTree(iterations=300, seed=0)
+        board = Board()
+        for key in (0, 3, 1, 4):
+            board.push(key)
+        self.assertEqual(tree.get_best_actions(board), [2])
+        board.pop()
+        board.push(8)
+        self.assertEqual(tree.get_best_actions(board), [2])
+        self.assertEqual(board.played_keys, [0, 3, 1, 8])
+
+    def test_transpositions(self):
+        """Symmetric children share statistics."""
+        tree = MCTSTree(iterations=200, seed=0)
+        board = Board()
+        tree.search(board)
+        values = dict(tree.get_action_values(board))
+        self.assertEqual(values[0], values[8])
+        self.assertEqual(values[1], values[3])
+
+    def test_batch(self):
+        """Virtual losses are removed, batched search finds win in one."""
+        tree = MCTSTree(iterations=320, batch=8, seed=0)
+        board = Board()
+        for key in (0, 3, 1, 4):
+            board.push(key)
+        self.assertEqual(tree.get_best_actions(board), [2])
+        self.assertEqual(tree.visits[hash(board)], 320)
+        self.assertEqual(tree.visits.min(), 0)
+
+    def test_root_parallel(self):
+        """Playouts of workers are merged."""
+        tree = RootParallelMCTSTree(iterations=100, workers=2, seed=0)
+        try:
+            board = Board()
+            self.assertEqual(tree.search(board), 200)
+            board.push(4)
+            board.push(0)
+            reused = tree.visits[hash(board)]
+            self.assertGreater(reused, 0)
+            tree.search(board)
+        finally:
+            tree.close()
+        self.assertEqual(tree.visits[hash(board)], reused + 200)
+
+    def test_budget(self):
+        tree = MCTSTree(iterations=None, time_limit=.05, seed=0)
+        self.assertGreater(tree.search(Board()), 0)
+
+    def test_minimax(self):
+        """Draws every game against minimax."""
+        mcts = Spawn.get_agent('mcts', TreeSearch, MCTSTree,
+                               {'iterations': 300, 'seed': 0})
+        game = Game(agent1=mcts, agent2=Spawn.get_agent('minimax', seed=0))
+        game.compete(4)
+        self.assertEqual(mcts.record[1], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from metrics import MetricsLog, read_log, iter_log
+
+class TestMetricsLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'test_log')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_append_read(self):
+        log = MetricsLog(self.path, (2, 3), int, flush_rows=4)
+        rows = np.arange(60).reshape((10, 2, 3))
+        for row in rows[:6]:
+            log.append(row)
+        self.assertEqual(len(read_log(self.path)), 4) # one chunk flushed
+        np.testing.assert_array_equal(log.read(), rows[:6])
+        log.close()
+
+        log = MetricsLog(self.path, (2, 3), int, append=True)
+        for row in rows[6:]:
+            log.append(row)
+        log.close()
+        np.testing.assert_array_equal(read_log(self.path), rows)
+        chunks = list(iter_log(self.path, chunk_rows=3))
+        self.assertEqual([len(c) for c in chunks], [3, 3, 3, 1])
+
+    def test_partial_row(self):
+        log = MetricsLog(self.path, (2,), float)
+        log.append([1, 2])
+        log.close()
+        with open(self.path + '.bin', 'ab') as f:
+            f.write(b'\0'*3)
+        np.testing.assert_array_equal(read_log(self.path), [[1, 2]])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from pns import PNSTree
+from board import Board
+from graph import get_graph
+from minimax import MinimaxTree
+from game import Game
+from agent import Spawn
+
+class TestPNSTree(unittest.TestCase):
+
+    def test_solve(self):
+        """Solved value of every state equals minimax value."""
+        values = MinimaxTree().table.values
+        for state, board in enumerate(get_graph().boards):
+            self.assertEqual(PNSTree().solve(board.copy()), values[state])
+
+    def test_bound(self):
+        self.assertIsNone(PNSTree(max_nodes=10).solve(Board()))
+        tree = PNSTree()
+        self.assertEqual(tree.solve(Board()), 0)
+        self.assertLess(len(tree.numbers), 765)
+
+    def test_agent(self):
+        pns = Spawn.get_agent('pns')
+        game = Game(agent1=pns, agent2=Spawn.get_agent('minimax', seed=0))
+        game.compete(4)
+        self.assertEqual(pns.record[1], 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+import numpy as np
+
+from ps import PSSelfPlay
+from dp import UniformTree
+from minimax import MinimaxTree
+
+class TestPSSelfPlay(unittest.TestCase):
+
+    def test_convergence(self):
+        """Sweeps converge to DP values in fewer backups than two per state."""
+        for backup, tree in (('minimax', MinimaxTree()),
+                             ('expectimax', UniformTree())):
+            ps = PSSelfPlay(backup=backup, seed=0)
+            ps.run(200)
+            self.assertLess(ps.backups, 2*765)
+            np.testing.assert_allclose(ps.get_values(), tree.table.values,
+                                       atol=1e-5)
+            self.assertLess(ps.get_episode_delta(), 1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+import unittest
+
+import numpy as np
+
+from ql import QSSelfPlay
+
+class TestQSSelfPlay(unittest.TestCase):
+
+    def test_memoized_search(self):
+        """Cached search values equal a fresh search after value updates."""
+        np.random.seed(0)
+        qs = QSSelfPlay(depth=3, epsilon=5, seed=0)
+        for _ in range(50):
+            qs.run(5)
+            fresh = QSSelfPlay(depth=3, values=qs.values)
+            for key in np.random.permutation(9)[:4]:
+                qs.board.push(key)
+                fresh.board.push(key)
+                self.assertEqual(qs.get_best_value(), fresh.get_best_value())
+            qs.board.reset()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+
+from board import Board
+from graph import get_graph
+from ranking import Ranking, RANKING, to_board
+
+class TestRanking(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Unrank of every index ranks back to it, positions are distinct."""
+        indices = np.arange(len(RANKING))
+        values = RANKING.unrank(indices)
+        np.testing.assert_array_equal(RANKING.rank(values), indices)
+        self.assertEqual(len(np.unique(values, axis=0)), len(RANKING))
+        ones = (values == 1).sum(axis=1)
+        twos = (values == 2).sum(axis=1)
+        self.assertTrue(((ones - twos == 0) | (ones - twos == 1)).all())
+
+    def test_boards(self):
+        """Boards of game rebuild from index with equal hash."""
+        boards = get_graph().boards
+        indices = RANKING.rank(np.array([board.values for board in boards]))
+        for board, values in zip(boards, RANKING.unrank(indices)):
+            rebuilt = to_board(values)
+            self.assertEqual(hash(rebuilt), hash(board))
+            self.assertEqual(rebuilt.winner, board.winner)
+            self.assertEqual(rebuilt.moves(), board.moves())
+        self.assertEqual(RANKING.rank(Board().values)[0], 0)
+
+    def test_cells(self):
+        """Ranking of larger board, sampled."""
+        ranking = Ranking(16)
+        indices = np.random.default_rng(0).integers(len(ranking), size=1000)
+        np.testing.assert_array_equal(ranking.rank(ranking.unrank(indices)),
+                                      indices)
+
+if __name__ == '__main__':
+    unittest.main()
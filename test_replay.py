@@ -0,0 +1,94 @@
+import unittest
+
+import numpy as np
+
+from board import Board
+from fa import TDLFASelfPlay, TSFASelfPlay
+from ps import PSSelfPlay
+from ql import QSelfPlay, QSSelfPlay
+from replay import ReplayBuffer, encode_states, decode_states
+from rl import MCSelfPlay, TDSelfPlay, TDLSelfPlay
+from ts import TSSelfPlay, TSABSelfPlay
+
+class TestReplay(unittest.TestCase):
+
+    def test_encode(self):
+        """Row holds state of each move from root, then utility."""
+        board = Board()
+        states = [hash(board)]
+        for key in (4, 0, 8, 2, 1, 7):
+            board.push(key)
+            states.append(hash(board))
+        self.assertEqual(decode_states(encode_states(board)),
+                         (states, board.utility()))
+
+    def test_ring(self):
+        """Full buffer replaces oldest episodes. Samples are stored rows."""
+        learner = MCSelfPlay(seed=0)
+        learner.replay = ReplayBuffer(capacity=5, seed=0)
+        learner.run(12)
+        self.assertEqual(len(learner.replay), 5)
+        self.assertEqual(learner.replay.count, 12)
+        rows = {row.tobytes() for row in learner.replay.rows}
+        for row in learner.replay.sample(20):
+            self.assertIn(row.tobytes(), rows)
+        np.testing.assert_array_equal(learner.replay.recent(2)[-1],
+                                      learner.replay.rows[12 % 5 - 1])
+
+    def test_evaluate_states(self):
+        """Replay of an episode updates values as the episode did."""
+        for rl in (MCSelfPlay, TDSelfPlay, TDLSelfPlay, QSelfPlay,
+                   QSSelfPlay):
+            a, b = rl(seed=3), rl()
+            a.replay = ReplayBuffer()
+            a.run(1)
+            a.replay.replay(b, 1)
+            np.testing.assert_array_equal(a.get_values(), b.get_values())
+
+    def test_linear(self):
+        """Replay into linear learner moves weights."""
+        a = TDLFASelfPlay(seed=5)
+        a.replay = ReplayBuffer(seed=5)
+        a.run(5)
+        weights = a.values.weights.copy()
+        values = a.get_values().copy()
+        a.replay.replay(a, 20)
+        self.assertFalse(np.array_equal(weights, a.values.weights))
+        a.values.refresh()
+        self.assertFalse(np.array_equal(values, a.get_values()))
+
+    def test_refuse(self):
+        """Learners without replay update are refused."""
+        buffer = ReplayBuffer()
+        buffer.add(MCSelfPlay(seed=0).board)
+        for rl in (TSSelfPlay, TSABSelfPlay, TSFASelfPlay, PSSelfPlay):
+            learner = rl()
+            with self.assertRaises(ValueError):
+                learner.replay = buffer
+            with self.assertRaises(ValueError):
+                buffer.replay(learner, 1)
+
+    def test_state(self):
+        learner = TDSelfPlay(seed=4)
+        learner.replay = ReplayBuffer(capacity=8, seed=4)
+        learner.run(10)
+        other = ReplayBuffer(capacity=8)
+        other.set_state(learner.replay.get_state())
+        np.testing.assert_array_equal(other.sample(5),
+                                      learner.replay.sample(5))
+
+        # buffer is part of learner state
+        resumed = TDSelfPlay()
+        resumed.set_state(learner.get_state())
+        self.assertEqual(resumed.replay.count, 10)
+        np.testing.assert_array_equal(resumed.replay.rows,
+                                      learner.replay.rows)
+        learner.run(3)
+        resumed.run(3)
+        np.testing.assert_array_equal(resumed.replay.rows,
+                                      learner.replay.rows)
+        np.testing.assert_array_equal(resumed.get_values(),
+                                      learner.get_values())
+
+if __name__ == '__main__':
+    unittest.main()
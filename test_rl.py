@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from rl import MCSelfPlay, TDLSelfPlay, RANDOM_BATCH
+
+class TestSeed(unittest.TestCase):
+
+    def test_streams(self):
+        """Same seed repeats episodes. Spawned seeds give distinct streams."""
+        for rl in (MCSelfPlay, TDLSelfPlay):
+            a, b = rl(seed=1), rl(seed=1)
+            a.run(50)
+            b.run(50)
+            np.testing.assert_array_equal(a.get_values(), b.get_values())
+
+            seeds = np.random.SeedSequence(1).spawn(2)
+            c, d = rl(seed=seeds[0]), rl(seed=seeds[1])
+            c.run(50)
+            d.run(50)
+            self.assertFalse(np.array_equal(c.get_values(), d.get_values()))
+
+    def test_state(self):
+        """Restored state continues the same random stream."""
+        a = MCSelfPlay(seed=2)
+        a.run(7)
+        b = MCSelfPlay()
+        b.set_state(a.get_state())
+        a.run(20)
+        b.run(20)
+        np.testing.assert_array_equal(a.get_values(), b.get_values())
+
+class TestPolicy(unittest.TestCase):
+
+    def test_one_draw(self):
+        """Each policy step takes one uniform number."""
+        learner = MCSelfPlay(seed=5)
+        learner.run(20)
+        for greedy in (False, True):
+            index = learner.random_index % RANDOM_BATCH
+            learner.policy(greedy)
+            self.assertEqual(learner.random_index % RANDOM_BATCH,
+                             (index + 1) % RANDOM_BATCH)
+
+    def test_greedy(self):
+        """Greedy picks every best action, and only best actions."""
+        learner = MCSelfPlay(seed=6)
+        learner.board.push(4)
+        for action in (0, 2, 6, 8):
+            learner.board.push(action)
+            learner.values[learner.board] = -1
+            learner.board.pop()
+        chosen = {learner.policy(greedy=True) for _ in range(200)}
+        self.assertEqual(chosen, {0, 2, 6, 8})
+        self.assertEqual(learner.get_best_value(), -1)
+
+    def test_random(self):
+        """Unvisited state explores, every action is reached."""
+        learner = MCSelfPlay(seed=7)
+        counts = np.zeros(9)
+        for _ in range(900):
+            counts[learner.policy()] += 1
+        self.assertTrue((counts > 60).all())
+
+if __name__ == '__main__':
+    unittest.main()
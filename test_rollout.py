@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from board import Board
+from minimax import MinimaxTree
+from rollout import rollout, from_boards, get_states
+
+class TestRollout(unittest.TestCase):
+
+    def test_states(self):
+        """Vectorized hash equals board hash at each ply."""
+        board = Board()
+        boards = [board.copy()]
+        for key in (4, 0, 2, 6, 3, 5, 1, 7, 8):
+            board.push(key)
+            boards.append(board.copy())
+        np.testing.assert_array_equal(get_states(from_boards(boards)),
+                                      [hash(board) for board in boards])
+
+    def test_random(self):
+        """Outcome frequencies match one at a time play on Board."""
+        rng = np.random.default_rng(0)
+        utilities = rollout(np.zeros((20000, 9), int), rng)
+        expected = []
+        board = Board()
+        for _ in range(20000):
+            while not board.is_terminal():
+                actions = board.get_actions()
+                board.push(actions[rng.integers(len(actions))])
+            expected.append(board.utility())
+            board.reset()
+        for utility in (-1, 0, 1):
+            self.assertAlmostEqual(np.mean(utilities == utility),
+                                   np.mean(np.array(expected) == utility),
+                                   delta=.02)
+
+    def test_greedy(self):
+        """Greedy play on minimax values draws from any start, finishes
+        terminal boards at once."""
+        rng = np.random.default_rng(0)
+        values = MinimaxTree().table.values
+        boards = np.zeros((100, 9), int)
+        boards[50:, 4] = 1
+        np.testing.assert_array_equal(rollout(boards, rng, values), 0)
+        won = np.array([[1, 1, 1, 2, 2, 0, 0, 0, 0]])
+        np.testing.assert_array_equal(rollout(won, rng, values), [1])
+
+if __name__ == '__main__':
+    unittest.main()
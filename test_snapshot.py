@@ -0,0 +1,57 @@
+import pickle
+import unittest
+
+from board import Board, Snapshot
+from graph import get_graph
+from transposition import Table
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Snapshot keeps position, hash and winner of every state."""
+        for board in get_graph().boards:
+            snapshot = board.snapshot()
+            self.assertEqual(hash(snapshot), hash(board))
+            self.assertEqual(snapshot, board)
+            other = snapshot.to_board()
+            self.assertEqual(other.hash_value, board.hash_value)
+            self.assertEqual(other.winner, board.winner)
+            self.assertEqual(other.cells, board.cells)
+            self.assertEqual(other.snapshot(), snapshot)
+            self.assertEqual(int(other.snapshot()), int(snapshot))
+
+    def test_push_pop(self):
+        """Board bits follow push and pop."""
+        board = Board()
+        for key in (4, 0, 8, 2):
+            board.push(key)
+        self.assertEqual(int(board.snapshot()),
+                         1 << 4 | 1 << 8 | 1 << 9 | 1 << 11)
+        board.pop()
+        board.pop()
+        self.assertEqual(int(board.snapshot()), 1 << 4 | 1 << 9)
+        self.assertEqual(board.snapshot().moves(), 2)
+
+    def test_keys(self):
+        """Symmetric snapshots are one key of dicts and tables."""
+        a, b = Board(), Board()
+        a.push(0)
+        b.push(8)
+        self.assertNotEqual(int(a.snapshot()), int(b.snapshot()))
+        self.assertEqual(len({a.snapshot(), b.snapshot()}), 1)
+        table = Table()
+        table[a.snapshot()] = 0.5
+        self.assertEqual(table[b], 0.5)
+
+    def test_pickle(self):
+        board = Board()
+        board.push(4)
+        snapshot = board.snapshot()
+        other = pickle.loads(pickle.dumps(snapshot))
+        self.assertIsInstance(other, Snapshot)
+        self.assertEqual(int(other), int(snapshot))
+        with self.assertRaises(AttributeError):
+            snapshot.bits = 0
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+import numpy as np
+
+from stats import instrument
+from minimax import MinimaxTree
+from ts import TSSelfPlay, TSABSelfPlay
+
+class TestSearchStats(unittest.TestCase):
+
+    def test_minimax(self):
+        tree = instrument(MinimaxTree)()
+        stats = tree.stats
+        np.testing.assert_array_equal(tree.table.values,
+                                      MinimaxTree().table.values)
+        self.assertEqual(stats.total['calls'], 1)
+        self.assertEqual(stats.max_depth, 9)
+        self.assertEqual(stats.nodes, stats.children + 1)
+        self.assertEqual(stats.misses + stats.hits +
+                         stats.cutoffs['terminal'], stats.nodes)
+        self.assertFalse(stats.cutoffs['alpha'] or stats.cutoffs['beta'])
+
+    def test_alphabeta(self):
+        nodes = []
+        for cls in (TSSelfPlay, TSABSelfPlay):
+            rl = instrument(cls)(depth=4)
+            rl.explore(4, evaluate=False)
+            nodes.append(rl.stats.nodes)
+        self.assertTrue(rl.stats.cutoffs['alpha'] + rl.stats.cutoffs['beta'])
+        self.assertLess(nodes[1], nodes[0])
+
+if __name__ == '__main__':
+    unittest.main()
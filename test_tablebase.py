@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+import tablebase
+from tablebase import Tablebase
+from board import Board
+from graph import get_graph
+from minimax import MinimaxTree
+from mcts import MCTSTree
+from pns import PNSTree
+
+class TestTablebase(unittest.TestCase):
+
+    def test_values(self):
+        """Values equal minimax values, only states with few empty cells."""
+        values = MinimaxTree().table.values
+        moves = get_graph().moves
+        base = Tablebase(4)
+        np.testing.assert_array_equal(base.values, values[base.states])
+        np.testing.assert_array_equal(base.states,
+                                      np.flatnonzero(moves >= 5))
+        self.assertIsNone(base.probe(Board()))
+        self.assertEqual(len(Tablebase(9)), 765)
+
+    def test_load(self):
+        data_path = tablebase.DATA_PATH
+        with tempfile.TemporaryDirectory() as path:
+            tablebase.DATA_PATH = path + '/'
+            try:
+                base = Tablebase.load(3)
+                loaded = Tablebase.load(3)
+            finally:
+                tablebase.DATA_PATH = data_path
+        np.testing.assert_array_equal(base.states, loaded.states)
+        np.testing.assert_array_equal(base.values, loaded.values)
+
+    def test_search(self):
+        """Searches probe tablebase at leaves."""
+        base = Tablebase(9)
+        tree = PNSTree(tablebase=base)
+        self.assertEqual(tree.solve(Board()), 0)
+        self.assertEqual(len(tree.numbers), 1) # root in tablebase
+        board = Board()
+        for key in (0, 3, 1, 4):
+            board.push(key)
+        tree = MCTSTree(iterations=50, batch=5, tablebase=Tablebase(4),
+                        seed=0)
+        self.assertEqual(tree.get_best_actions(board), [2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import train_play
+from train_play import Train, tune_param
+from fa import TSFASelfPlay
+from replay import ReplayBuffer
+from rl import MCSelfPlay
+
+class InterruptedTrain(Train):
+
+    interrupt_run = 2
+
+    def add_data_record(self, i):
+        """Interrupt record phase of interrupt_run."""
+        if i == self.interrupt_run:
+            raise KeyboardInterrupt
+        super().add_data_record(i)
+
+class TestTrainCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.data_path = train_play.DATA_PATH
+        train_play.DATA_PATH = self.dir.name + '/'
+
+    def tearDown(self):
+        train_play.DATA_PATH = self.data_path
+        self.dir.cleanup()
+
+    def test_resume(self):
+        """Resumed training equals uninterrupted training."""
+        for rl, name in ((MCSelfPlay, 'mc'), (TSFASelfPlay, 'tsfa')):
+            full = Train(rl(seed=0), name, 5, 6, 10, seed=0)
+            full.run()
+
+            part = Train(rl(seed=0), name, 5, 3, 10, checkpoint_runs=3,
+                         seed=0)
+            part.run()
+            part.rl.run(5) # progress lost after checkpoint
+            resumed = Train(rl(), name, 5, 6, 10, resume=True)
+            resumed.run()
+
+            np.testing.assert_array_equal(resumed.rl.get_values(),
+                                          full.rl.get_values())
+            np.testing.assert_array_equal(resumed.data_record,
+                                          full.data_record)
+            np.testing.assert_array_equal(resumed.data_delta,
+                                          full.data_delta)
+            self.assertEqual(resumed.convergence, full.convergence)
+
+    def test_resume_replay(self):
+        """Replay buffer of learner is restored from checkpoint."""
+        rl = MCSelfPlay(seed=0)
+        rl.replay = ReplayBuffer(seed=0)
+        part = Train(rl, 'mc', 5, 2, 10, checkpoint_runs=2, seed=0)
+        part.run()
+        resumed = Train(MCSelfPlay(), 'mc', 5, 2, 10, resume=True)
+        self.assertEqual(resumed.rl.replay.count, 10)
+        np.testing.assert_array_equal(resumed.rl.replay.rows, rl.replay.rows)
+
+    def test_interrupt(self):
+        """Interrupt of endless training leaves logs of equal length."""
+        train = InterruptedTrain(MCSelfPlay(seed=0), 'mc', 5, None, 10,
+                                 seed=0)
+        train.run()
+        self.assertEqual(train.runs, 1)
+        self.assertEqual(len(train.data_delta), 2)
+        self.assertEqual(len(train.data_record), 2)
+        self.assertTrue(train.log_delta.file.closed)
+        self.assertTrue(train.log_record.file.closed)
+
+        # interrupt before first record
+        train = InterruptedTrain(MCSelfPlay(seed=0), 'mc', 5, None, 10,
+                                 seed=0)
+        train.interrupt_run = 0
+        train.run()
+        self.assertIsNone(train.final_win_share)
+        self.assertEqual(len(train.data_delta), 0)
+
+    def test_sweep(self):
+        """Finished sweep drops checkpoint. Other grid does not resume."""
+        path = train_play.DATA_PATH + 'mc_checkpoint.npz'
+        tune_param(MCSelfPlay, 'mc', 2, 2, 10, gammas=[1], alphas=[.5],
+                   epsilons=[1, 5], checkpoint_runs=1)
+        self.assertFalse(os.path.exists(path))
+
+        Train(MCSelfPlay(), 'mc', 2, 1, 10, checkpoint_runs=1,
+              param_index=0, param_grid=[(1, .5, 1)]).run()
+        self.assertTrue(os.path.exists(path))
+        with self.assertRaises(ValueError):
+            tune_param(MCSelfPlay, 'mc', 2, 2, 10, gammas=[1], alphas=[.5],
+                       epsilons=[1, 5], checkpoint_runs=1, resume=True)
+
+        Train(MCSelfPlay(), 'mc', 2, 1, 10, checkpoint_runs=1,
+              param_index=1, param_grid=[(1, .5, 1), (1, .5, 5)]).run()
+        tune_param(MCSelfPlay, 'mc', 2, 2, 10, gammas=[1], alphas=[.5],
+                   epsilons=[1, 5], checkpoint_runs=1, resume=True)
+        self.assertFalse(os.path.exists(path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+
+import transposition
+from transposition import Table, SharedTable, check_quantized
+from board import Board
+from dp import UniformTree
+from minimax import MinimaxTree
+
+class TestSharedTable(unittest.TestCase):
+
+    def test_publish(self):
+        """Attached table sees published values, pulls only new versions."""
+        table = SharedTable()
+        try:
+            other = pickle.loads(pickle.dumps(table))
+            values = np.zeros(765)
+            self.assertEqual(other.pull(values), 0)
+            self.assertTrue((values == table.default).all())
+
+            table.publish(np.arange(765.))
+            self.assertEqual(other.pull(values, 0), 2)
+            np.testing.assert_array_equal(values, np.arange(765.))
+            values[:] = 0
+            self.assertEqual(other.pull(values, 2), 2)
+            self.assertFalse(values.any())
+
+            table[Board()] = 7
+            self.assertEqual(other[Board()], 7)
+            other.close()
+        finally:
+            table.close()
+
+    def test_load_mmap(self):
+        """Mapped values equal saved values, writes are private."""
+        data_path = transposition.DATA_PATH
+        with tempfile.TemporaryDirectory() as path:
+            transposition.DATA_PATH = path + '/'
+            try:
+                Table(np.arange(765.)).save_values('test')
+                table, other = Table(), Table()
+                self.assertTrue(table.load_values('test', mmap=True))
+                self.assertTrue(other.load_values('test', mmap=True))
+                table[Board()] = -1
+                self.assertEqual(other[Board()], 0)
+                np.testing.assert_array_equal(other.values[1:],
+                                              np.arange(1, 765.))
+            finally:
+                transposition.DATA_PATH = data_path
+
+class TestQuantize(unittest.TestCase):
+
+    def test_round_trip(self):
+        """Quantized tables keep greedy policy of DP tables."""
+        for tree in (MinimaxTree(), UniformTree()):
+            for dtype, tolerance in (('float16', 1e-3), ('int8', 1/254)):
+                error, same = check_quantized(tree.table.values, dtype)
+                self.assertLessEqual(error, tolerance)
+                self.assertEqual(same, 1)
+        self.assertEqual(check_quantized(MinimaxTree().table.values,
+                                         'int8'), (0, 1))
+
+    def test_save(self):
+        data_path = transposition.DATA_PATH
+        with tempfile.TemporaryDirectory() as path:
+            transposition.DATA_PATH = path + '/'
+            try:
+                table = Table()
+                table[Board()] = .5
+                table.save_values('test', 'int8')
+                loaded = Table()
+                loaded.load_values('test', mmap=True)
+                self.assertAlmostEqual(loaded[Board()], 64/127)
+                self.assertEqual(loaded.values.dtype, np.float64)
+                self.assertEqual((loaded.values == loaded.default).sum(),
+                                 764)
+                table[Board()] = 2.4
+                with self.assertRaises(ValueError):
+                    table.save_values('test', 'int8')
+                table.save_values('test', 'float16')
+            finally:
+                transposition.DATA_PATH = data_path
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+import numpy as np
+
+from transposition import DefaultTable
+from ts import TSSelfPlay, TSABSelfPlay
+
+class TestTSABSelfPlay(unittest.TestCase):
+
+    def test_explore(self):
+        """Alpha beta root value equals plain minimax on same values."""
+        np.random.seed(0)
+        values = np.random.uniform(-1, 1, 765)
+        for depth in range(1, 5):
+            for keys in ((), (4,), (0, 4), (0, 4, 8)):
+                ts = TSSelfPlay(depth=depth, values=DefaultTable(values.copy()))
+                ab = TSABSelfPlay(depth=depth,
+                                  values=DefaultTable(values.copy()))
+                for key in keys:
+                    ts.board.push(key)
+                    ab.board.push(key)
+                expected = ts.explore(depth, evaluate=False)
+                ab.search_table.clear()
+                self.assertAlmostEqual(ab.explore(depth, evaluate=False),
+                                       expected)
+
+    def test_run(self):
+        ab = TSABSelfPlay(epsilon=1, depth=4, seed=0)
+        ab.run(50)
+        self.assertTrue(ab.get_episode_delta() >= 0)
+
+if __name__ == '__main__':
+    unittest.main()
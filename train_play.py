@@ -1,6 +1,8 @@
 
 import numpy as np
-from itertools import product
+import time
+from contextlib import contextmanager
+from itertools import count, product
 
 from game import Game
 from agent import Spawn
@@ -9,96 +11,236 @@ from transposition import Table
 from rl import RLSelfPlayTree, MCSelfPlay, TDSelfPlay, TDLSelfPlay
 from ql import QSelfPlay, QSSelfPlay
 from ts import TSSelfPlay
+from sampler import SamplingProfiler
+from metrics import MetricsLog
 
 import os
 
 DATA_PATH = os.getcwd() + '/data/'
 
+PHASES = ('learn', 'delta', 'record')
+
+CHECKPOINT_KEYS = ('last_run', 'last_loss', 'last_record', 'start_win_share',
+                   'timings', 'param_index', 'param_grid')
+
 DP = [Spawn.get_agent('random'), Spawn.get_agent('uniform'),
       Spawn.get_agent('discount'), Spawn.get_agent('minimax')]
 
 class Train:
 
-    def __init__(self, rl, name, episodes, runs, compete_runs):
+    def __init__(self, rl, name, episodes, runs, compete_runs,
+                 profiler=None, checkpoint_runs=None, resume=False,
+                 param_index=None, seed=None, param_grid=None):
         self.rl = rl
         self.name = name
         self.episodes = episodes
         self.runs = runs
         self.compete_runs = compete_runs
+        # independent rng streams for searches of dp agents and rl agent
+        seeds = np.random.SeedSequence(seed).spawn(len(DP) + 1)
+        for agent, agent_seed in zip(DP, seeds):
+            agent.search.rng = np.random.default_rng(agent_seed)
         self.rl_agent = Spawn.get_agent(name + '_play', TreeSearch,
                                         RLSelfPlayTree,
-                                        {'table':Table(rl.get_values())})
+                                        {'table':Table(rl.get_values())},
+                                        seeds[-1])
         self.convergence = None
         self.start_win_share = None
         self.final_win_share = None
-        self.data_delta = np.zeros((runs+1, 2))
+        # rows streamed to data/<name>_log_* as each run ends
+        # runs=None trains until interrupted
+        self.log_delta = MetricsLog(DATA_PATH + name + '_log_delta', (2,),
+                                    float, append=resume)
         # wins draws loss win_share
-        self.data_record = np.zeros((runs+1, len(DP), 4), int)
+        self.log_record = MetricsLog(DATA_PATH + name + '_log_record',
+                                     (len(DP), 4), int, append=resume)
+        self.last_record = None
+        self.last_run = -1
+        self.last_loss = -1
         self.game = Game()
+        # seconds spent in each phase: learning, delta, record evaluation
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        self.profiler = profiler
+        # save checkpoint every checkpoint_runs runs, None for never
+        self.checkpoint_runs = checkpoint_runs
+        # index of parameters in tune_param sweep, and list of parameters
+        # of sweep, saved with checkpoint
+        self.param_index = param_index
+        self.param_grid = param_grid
+        if resume:
+            self.load_checkpoint()
+
+    @property
+    def data_delta(self):
+        """Array of (mean, std) of delta of each run, memory mapped."""
+        return self.log_delta.read()
+
+    @property
+    def data_record(self):
+        """Array of record against each DP agent of each run, mapped."""
+        return self.log_record.read()
 
     def run(self):
-        self.add_delta(0)
-        self.add_data_record(0)
-        self.set_start_win_share()
-        for i in range(1, self.runs+1):
-            self.rl.run(self.episodes)
-            self.add_delta(i)
-            self.add_data_record(i)
+        self.save_log_kwargs()
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            self.run_phases()
+        except KeyboardInterrupt:
+            if self.runs is not None:
+                raise
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+            # interrupt may leave a delta row of a run without record
+            for log in (self.log_delta, self.log_record):
+                log.flush()
+                log.truncate(self.last_run + 1)
+                log.close()
+        if self.runs is None:
+            self.runs = self.last_run
         self.set_convergence()
         self.set_final_win_share()
+        self.save_log_kwargs()
+
+    def run_phases(self):
+        if self.last_run < 0:
+            with self.phase('delta'):
+                self.add_delta(0)
+            with self.phase('record'):
+                self.add_data_record(0)
+            self.set_start_win_share()
+        start = self.last_run + 1
+        runs = count(start) if self.runs is None else range(start,
+                                                             self.runs+1)
+        for i in runs:
+            with self.phase('learn'):
+                self.rl.run(self.episodes)
+            with self.phase('delta'):
+                self.add_delta(i)
+            with self.phase('record'):
+                self.add_data_record(i)
+            if self.checkpoint_runs and not i % self.checkpoint_runs:
+                self.save_checkpoint()
+
+    @contextmanager
+    def phase(self, name):
+        """Add time of block to timings of phase. Tag profiler samples."""
+        if self.profiler is not None:
+            self.profiler.phase = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+            if self.profiler is not None:
+                self.profiler.phase = None
 
     def add_delta(self, i):
         deltas = np.array([self.rl.get_episode_delta() for i in range(10)])
-        self.data_delta[i] = [np.mean(deltas), np.std(deltas)]
+        self.log_delta.append([np.mean(deltas), np.std(deltas)])
 
     def add_data_record(self, i):
         self.rl_agent.search.tree.change_values(self.rl.get_values())
-        for j in range(self.data_record.shape[1]):
+        record = np.zeros((len(DP), 4), int)
+        for j in range(len(DP)):
             self.rl_agent.reset_record()
             DP[j].reset_record()
             self.game.change_agents(agent1=self.rl_agent, agent2=DP[j])
             self.game.compete(self.compete_runs)
-            self.data_record[i,j,:3] = self.rl_agent.record
-            self.data_record[i,j,3] = self.rl_agent.win_share()
+            record[j,:3] = self.rl_agent.record
+            record[j,3] = self.rl_agent.win_share()
+        self.log_record.append(record)
+        self.last_record = record
+        self.last_run = i
+        if not self.convergence_test(record):
+            self.last_loss = i
 
     def set_convergence(self):
-        i = self.runs-1
-        while self.convergence_test(i):
-            i -= 1
-        i += 1
-        if i == self.runs:
+        """Set first run after which no run lost, inf if last run lost."""
+        i = self.last_loss + 1
+        if i > self.last_run:
             i = float('inf')
         self.convergence = i
 
-    def convergence_test(self, i):
-        """Return True if no losses against all DP agents during run i."""
-        return not self.data_record[i,:,2].any()
+    def convergence_test(self, record):
+        """Return True if no losses against all DP agents in record."""
+        return not record[:,2].any()
 
     def set_final_win_share(self):
-        self.final_win_share = self.data_record[-1,:,-1]
+        """Set win share of last record, None if run ended before one."""
+        if self.last_record is not None:
+            self.final_win_share = self.last_record[:,-1]
 
     def set_start_win_share(self):
-        self.start_win_share = self.data_record[0,:,-1]
+        self.start_win_share = self.last_record[:,-1]
 
     def get_data_kwargs(self):
         result = {key:value for key,value in self.__dict__.items()
                   if key in ('name', 'episodes', 'runs', 'compete_runs',
                              'convergence', 'start_win_share',
-                             'final_win_share')}
+                             'final_win_share', 'timings')}
         for param in ('alpha', 'gamma', 'epsilon'):
             result[param] = getattr(self.rl, param)
-        if self.name == 'tdl':
+        if self.name in ('tdl', 'tdlfa'):
             result['lambda_'] = self.rl.lambda_
-        elif self.name in ('qs', 'ts'):
+        elif self.name in ('qs', 'ts', 'tsab', 'tsfa'):
             result['depth'] = self.rl.depth
         return result
 
+    ## Checkpoint methods ##
+
+    def get_checkpoint_path(self):
+        return DATA_PATH + self.name + '_checkpoint.npz'
+
+    def save_checkpoint(self):
+        """Save learner state and run counters. Replace file atomically.
+
+        Logs are flushed first, so they hold at least the checkpointed
+        rows. Any later rows are dropped on resume."""
+        self.log_delta.flush()
+        self.log_record.flush()
+        state = self.rl.get_state()
+        state['train'] = np.array({key: getattr(self, key) for key in
+                                   CHECKPOINT_KEYS}, dtype=object)
+        state['search_rngs'] = np.array([agent.search.rng.bit_generator.state
+                                         for agent in self.get_agents()],
+                                        dtype=object)
+        path = self.get_checkpoint_path()
+        with open(path + '.tmp', 'wb') as f:
+            np.savez_compressed(f, **state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
+    def load_checkpoint(self):
+        """Restore learner state and run counters. Cut logs to match."""
+        with np.load(self.get_checkpoint_path(), allow_pickle=True) as data:
+            state = dict(data)
+        self.__dict__.update(state.pop('train').item())
+        for agent, rng in zip(self.get_agents(), state.pop('search_rngs')):
+            agent.search.rng.bit_generator.state = rng
+        self.rl.set_state(state)
+        self.log_delta.truncate(self.last_run + 1)
+        self.log_record.truncate(self.last_run + 1)
+
+    def get_agents(self):
+        """Return list of dp agents and rl agent, whose searches own rngs."""
+        return DP + [self.rl_agent]
+
+    def save_log_kwargs(self):
+        """Save kwargs beside logs so live plots can read parameters."""
+        np.save(DATA_PATH + self.name + '_log_kwargs.npy',
+                self.get_data_kwargs())
+
     def save_data(self):
         np.save(DATA_PATH + self.name + '_data_values.npy', self.rl.get_values())
         np.save(DATA_PATH + self.name + '_data_kwargs.npy',
                 self.get_data_kwargs())
         np.save(DATA_PATH + self.name + '_data_delta.npy', self.data_delta)
         np.save(DATA_PATH + self.name + '_data_record.npy', self.data_record)
+        if self.profiler is not None:
+            self.profiler.save(DATA_PATH + self.name + '_profile.txt')
         print('data saved!', '\n')
 
 
@@ -107,25 +249,31 @@ def win_share_gt(a, b):
 
 def tune_param(rl, name, episodes, runs, compete_runs,
                gammas=None, alphas=None, epsilons=None, lambdas_=None,
-               depths=None):
+               depths=None, profile=False, checkpoint_runs=None,
+               resume=False):
+    """Train rl with each parameter combination, save best data.
+
+    With checkpoint_runs, each Train saves a checkpoint every checkpoint_runs
+    runs. With resume, skip parameters before the checkpointed one and
+    continue its Train from the checkpoint."""
     print(name)
-    print('episodes=%d, runs=%d, complete_runs=%d' %
+    # runs=None trains each parameter set until interrupted
+    print('episodes=%d, runs=%s, complete_runs=%d' %
           (episodes, runs, compete_runs))
-    games = episodes * runs
     if gammas is None:
         gammas = (1, .9)
     if alphas is None:
         alphas = iter([.1,.3,.5,.7])
     if epsilons is None:
         epsilons = (1,5,25)
-    if name == 'tdl':
+    if name in ('tdl', 'tdlfa'):
         if lambdas_ is None:
             lambdas_ = iter([0,.2,.5])
-    elif name in ('qs', 'ts'):
+    elif name in ('qs', 'ts', 'tsab', 'tsfa'):
         if depths is None:
             depths = range(1, 3)
     parameters = (gammas, alphas, epsilons, lambdas_, depths)
-    parameters = product(*filter(None, parameters))
+    parameters = list(product(*filter(None, parameters)))
 
     try:
         rl_data_kwargs = np.load(DATA_PATH + name + '_data_kwargs.npy',
@@ -136,24 +284,50 @@ def tune_param(rl, name, episodes, runs, compete_runs,
         min_convergence = float('inf')
         max_win_share = [-float('inf')]*4
 
-    for param in parameters:
+    checkpoint_path = DATA_PATH + name + '_checkpoint.npz'
+    resume_index = -1
+    if resume:
+        try:
+            with np.load(checkpoint_path, allow_pickle=True) as data:
+                train = data['train'].item()
+        except FileNotFoundError:
+            pass
+        else:
+            if train.get('param_grid') != parameters:
+                raise ValueError('checkpoint of %s is of other parameters'
+                                 % name)
+            resume_index = train['param_index']
+
+    for k, param in enumerate(parameters):
+        if k < resume_index:
+            continue
         print('param:', *param)
         rlselfplay = rl(*param)
-        TP = Train(rlselfplay, name, episodes, runs, compete_runs)
+        profiler = SamplingProfiler() if profile else None
+        TP = Train(rlselfplay, name, episodes, runs, compete_runs, profiler,
+                   checkpoint_runs, k == resume_index, k,
+                   param_grid=parameters)
         TP.run()
         convergence = TP.convergence
         win_share = TP.final_win_share
         print('convergence:', convergence)
         print('start_win_share:', TP.start_win_share)
         print('final_win_share:', win_share)
+        print('timings:', {k: round(v, 2) for k,v in TP.timings.items()})
         print()
         if convergence < min_convergence:
             min_convergence = convergence
             TP.save_data()
-        elif min_convergence == float('inf'):
+        elif min_convergence == float('inf') and win_share is not None:
             if win_share_gt(win_share, max_win_share):
                 max_win_share = win_share
                 TP.save_data()
 
+    # sweep done, a later sweep must not resume it
+    try:
+        os.remove(checkpoint_path)
+    except FileNotFoundError:
+        pass
+
 if __name__ == '__main__':
     tune_param(TDSelfPlay, 'td', 10, 100, 100, gammas=[1])
@@ -4,6 +4,7 @@ import os
 import matplotlib.pyplot as plt
 
 from agent import Spawn
+from metrics import read_log
 
 DATA_PATH = os.getcwd() + '/data/'
 
@@ -33,21 +34,31 @@ class TrainPlot:
 
     titles = {'mc': 'MonteCarlo', 'td': 'Temporal Difference',
               'tdl': 'TD Lambda', 'q': 'Q', 'qs': 'Q Search',
-              'ts': 'TreeStrap'}
-
-    def __init__(self, name):
-        data_kwargs = np.load(DATA_PATH + name + '_data_kwargs.npy',
+              'ts': 'TreeStrap', 'tsab': 'TreeStrap Alpha Beta',
+              'tdlfa': 'Linear TD Lambda',
+              'tsfa': 'Linear TreeStrap', 'ps': 'Prioritized Sweeping'}
+
+    def __init__(self, name, live=False):
+        """Load saved data of name. If live, map logs of current training."""
+        data = 'log' if live else 'data'
+        data_kwargs = np.load(DATA_PATH + name + '_' + data + '_kwargs.npy',
                              allow_pickle='TRUE').item()
         self.__dict__.update(data_kwargs)
-        self.data_delta = np.load(DATA_PATH + name + '_data_delta.npy')
-        self.data_record = np.load(DATA_PATH + name + '_data_record.npy')
+        if live:
+            self.data_delta = read_log(DATA_PATH + name + '_log_delta')
+            self.data_record = read_log(DATA_PATH + name + '_log_record')
+        else:
+            self.data_delta = np.load(DATA_PATH + name + '_data_delta.npy',
+                                      mmap_mode='r')
+            self.data_record = np.load(DATA_PATH + name + '_data_record.npy',
+                                       mmap_mode='r')
 
     def get_param_text(self):
         text = 'Parameters: gamma={}, alpha={}, epsilon={}'.format(
             self.gamma, self.alpha, self.epsilon)
-        if self.name == 'tdl':
+        if self.name in ('tdl', 'tdlfa'):
             text += ', lambda=%.1f' % self.lambda_
-        elif self.name in ('qs', 'ts'):
+        elif self.name in ('qs', 'ts', 'tsab', 'tsfa'):
             text += ', depth=%d' % self.depth
         return text
 
@@ -102,13 +113,20 @@ class TrainPlot:
         fig.suptitle(title, y=.945, fontsize=22)
         text = self.get_param_text()
         fig.text(.5, .9, text, fontsize=12, horizontalalignment='center')
-        if self.convergence != float('inf'):
+        # live logs of a training still running have no results yet
+        win_share = self.final_win_share
+        if self.convergence is None:
+            text = 'Training in progress. '
+            if len(self.data_record):
+                win_share = self.data_record[-1,:,-1]
+        elif self.convergence != float('inf'):
             text = 'Converged in %d games. ' % (self.convergence*self.episodes)
         else:
             text = 'Did not converge. '
             text = 'Converged in 1000 games. '
-        text += 'Final win share '
-        text += '[' + ' '.join(str(x) for x in self.final_win_share) + ']'
+        if win_share is not None:
+            text += 'Final win share '
+            text += '[' + ' '.join(str(x) for x in win_share) + ']'
         fig.text(.5, .04, text, fontsize=12, horizontalalignment='center')
 
         runs = 75
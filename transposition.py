@@ -1,8 +1,73 @@
 import numpy as np
 import os
+from multiprocessing import shared_memory
+
+from graph import get_graph
 
 DATA_PATH = os.getcwd() + '/data/'
 
+DEFAULT = 3.14159265
+
+# values within -1 to 1 saved as int8 steps of 1/INT8_SCALE
+INT8_SCALE = 127
+INT8_MISSING = -128
+
+def quantize(values, dtype):
+    """Return values as dtype array: float64, float32, float16 or int8.
+
+    Missing values (DEFAULT) are marked NaN in float arrays, INT8_MISSING
+    in int8 arrays. Int8 holds values within -1 to 1 only, as tabular
+    utilities, others raise ValueError: approximated values, as of
+    LinearTable, may exceed it."""
+    dtype = np.dtype(dtype)
+    if dtype == np.float64:
+        return np.asarray(values)
+    missing = values == DEFAULT
+    if dtype == np.int8:
+        if (np.abs(values[~missing]) > 1).any():
+            raise ValueError('values outside -1 to 1 do not fit int8')
+        result = np.round(values * INT8_SCALE).astype(dtype)
+        result[missing] = INT8_MISSING
+    else:
+        result = values.astype(dtype)
+        result[missing] = np.nan
+    return result
+
+def dequantize(values):
+    """Return float64 values of quantize array, missing values DEFAULT."""
+    if values.dtype == np.float64:
+        return values
+    if values.dtype == np.int8:
+        result = values / INT8_SCALE
+        result[values == INT8_MISSING] = DEFAULT
+    else:
+        result = values.astype(np.float64)
+        result[np.isnan(result)] = DEFAULT
+    return result
+
+def check_quantized(values, dtype):
+    """Return max absolute error and share of states with same greedy
+    actions, of values round tripped through dtype.
+
+    Greedy actions of state are children of best value for agent to act,
+    ties within float error. Missing values count as zero, as for
+    RLSelfPlayTree."""
+    restored = dequantize(quantize(values, dtype))
+    seen = values != DEFAULT
+    error = np.abs(restored - values)[seen].max() if seen.any() else 0
+    values = np.where(seen, values, 0)
+    restored = np.where(seen, restored, 0)
+    graph = get_graph()
+    states = np.flatnonzero(~graph.terminals)
+    same = 0
+    for state in states:
+        children = list(graph.children[state])
+        best = np.max if graph.turns[state] == 1 else np.min
+        a, b = values[children], restored[children]
+        same += np.array_equal(np.isclose(a, best(a), rtol=0, atol=1e-9),
+                               np.isclose(b, best(b), rtol=0, atol=1e-9))
+    return error, same / len(states)
+
 class Table:
     """
     Array maps board by hash value. No reference to board object is kept.
@@ -12,21 +77,31 @@ class Table:
     """
 
     def __init__(self, values=None):
-        self.default = 3.14159265
+        self.default = DEFAULT
         if values is None:
             values = np.empty(765)
             values[:] = self.default
         self.values = values
 
-    def save_values(self, name):
-        np.save(DATA_PATH + name + '_data_values.npy', self.values)
+    def save_values(self, name, dtype='float64'):
+        """Save values under name, stored as dtype. See quantize."""
+        np.save(DATA_PATH + name + '_data_values.npy',
+                quantize(self.values, dtype))
 
-    def load_values(self, name):
+    def load_values(self, name, mmap=False):
+        """Load values saved under name. Return False if not saved.
+
+        With mmap, map file copy on write. Processes that load same name
+        share pages of file, a write stays private to its process. Values
+        saved quantized are converted to a float64 array in memory, not
+        mapped: quantizing shrinks files on disk, not tables in memory."""
         try:
-            self.values = np.load(DATA_PATH + name + '_data_values.npy')
-            return True
+            values = np.load(DATA_PATH + name + '_data_values.npy',
+                             mmap_mode='c' if mmap else None)
         except FileNotFoundError:
             return False
+        self.values = dequantize(values)
+        return True
 
     def __setitem__(self, board, item):
         self.values[hash(board)] = item
@@ -79,6 +154,64 @@ class DefaultTable(Table):
             return result
         return default
 
+class SharedTable(Table):
+    """
+    Table with values in named shared memory block, one copy for processes.
+
+    Pickles by block name, so a table passed to another process attaches to
+    the same values. Block starts with version counter, incremented by each
+    publish. Counter is odd while a publish copies values, so readers pull
+    a consistent copy without locks. One process publishes.
+
+    Creating process owns block, close unlinks it.
+    """
+
+    def __init__(self, values=None, name=None):
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True,
+                                                  size=8 + 765*8)
+        else:
+            self.shm = shared_memory.SharedMemory(name)
+        self.counter = np.ndarray(1, np.int64, buffer=self.shm.buf)
+        super().__init__(np.ndarray(765, np.float64, buffer=self.shm.buf,
+                                    offset=8))
+        if self.owner:
+            self.counter[0] = 0
+            self.values[:] = self.default if values is None else values
+
+    def __reduce__(self):
+        return SharedTable, (None, self.shm.name)
+
+    @property
+    def version(self):
+        return int(self.counter[0])
+
+    def publish(self, values):
+        """Copy values into table, increment version."""
+        self.counter[0] += 1
+        self.values[:] = values
+        self.counter[0] += 1
+
+    def pull(self, values, version=-1):
+        """Copy table into values if newer than version. Return version."""
+        while True:
+            start = self.version
+            if start == version:
+                return version
+            if start % 2:
+                continue # publish in progress
+            values[:] = self.values
+            if self.version == start:
+                return start
+
+    def close(self):
+        """Detach from block. Owner also frees it."""
+        self.counter = self.values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
 class Set:
     """
     Set stores boards by hash value. No reference to board object is kept.
@@ -6,8 +6,8 @@ from rl import RLSelfPlay
 class TSSelfPlay(RLSelfPlay):
 
     def __init__(self, gamma=1, alpha=.5, epsilon=15, depth=3, values=None,
-                 visits=None):
-        super().__init__(gamma, alpha, epsilon, values, visits)
+                 visits=None, seed=None):
+        super().__init__(gamma, alpha, epsilon, values, visits, seed)
         self.depth = depth
         self.search_tree = Set()
         self.max_delta = 0
@@ -20,12 +20,18 @@ class TSSelfPlay(RLSelfPlay):
             self.board.push(action)
 
     def policy(self, greedy, evaluate, delta):
-        if not greedy and not self.epsilon_greedy():
-            action = self.random_policy()
-        else:
-            self.explore(self.depth, evaluate, delta)
-            action = self.greedy_policy()
-        return action
+        """Return epsilon greedy action of one uniform draw, as RLSelfPlay.
+
+        Search runs only if greedy action is taken."""
+        u = self.random()
+        e = 0 if greedy else self.get_epsilon()
+        if u < e:
+            # searched states count visits in evaluate_tree_state
+            if evaluate:
+                self.visits[self.board] += 1
+            return self.random_policy(u / e)
+        self.explore(self.depth, evaluate, delta)
+        return self.greedy_policy((u - e) / (1 - e))
 
     def get_episode_delta(self):
         self.max_delta = 0
@@ -53,7 +59,7 @@ class TSSelfPlay(RLSelfPlay):
 
         for action in self.board.get_actions():
             self.board.push(action)
-            child = self.explore(depth-1)
+            child = self.explore(depth-1, evaluate)
             value = best(child, value)
             self.board.pop()
 
@@ -71,3 +77,114 @@ class TSSelfPlay(RLSelfPlay):
             self.values[self.board] = self.board.utility()
             return True
         return False
+
+class TSABSelfPlay(TSSelfPlay):
+    """TreeStrap(alpha-beta): search with pruning, update toward bounds.
+
+    Alpha beta search returns exact values only for nodes inside the search
+    window. A node that fails high has a lower bound, one that fails low an
+    upper bound. Interior values are only shifted when they violate the bound
+    of their node, as in TreeStrap(alpha-beta) of Veness et al.
+
+    Each search keeps a transposition table mapping board hash to (depth,
+    value, bound). Children are ordered by current value, best first, to cut
+    more of the tree.
+    """
+
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, gamma=1, alpha=.5, epsilon=15, depth=3, values=None,
+                 visits=None, seed=None):
+        super().__init__(gamma, alpha, epsilon, depth, values, visits, seed)
+        self.search_table = {}
+
+    def policy(self, greedy, evaluate, delta):
+        self.search_table.clear()
+        return super().policy(greedy, evaluate, delta)
+
+    def explore(self, depth, evaluate=True, delta=False, alpha=-2, beta=2):
+        if self.cutoff_test(depth):
+            return self.values[self.board]
+
+        key = hash(self.board)
+        item = self.search_table.get(key)
+        if item is not None and self.table_test(item, depth, alpha, beta):
+            return item[1]
+
+        window = alpha, beta
+        maximize = self.board.turn() == 1
+        value = -2 if maximize else 2
+
+        for action in self.get_ordered_actions(maximize):
+            self.board.push(action)
+            child = self.explore(depth-1, evaluate, False, alpha, beta)
+            self.board.pop()
+            if maximize:
+                value = max(child, value)
+                alpha = max(value, alpha)
+            else:
+                value = min(child, value)
+                beta = min(value, beta)
+            if alpha >= beta:
+                break
+
+        bound = self.get_bound(value, *window)
+        self.search_table[key] = depth, value, bound
+        if evaluate:
+            self.evaluate_tree_bound(value, bound)
+        if delta:
+            self.tree_bound_delta(value, bound)
+
+        return value
+
+    def get_ordered_actions(self, maximize):
+        """Return actions sorted by afterstate value, best first."""
+        items = []
+        for action in self.board.get_actions():
+            self.board.push(action)
+            items.append((self.values[self.board], action))
+            self.board.pop()
+        items.sort(reverse=maximize)
+        return [action for _,action in items]
+
+    def get_bound(self, value, alpha, beta):
+        """Return type of bound search value is of true value of board."""
+        if value <= alpha:
+            return self.UPPER
+        if value >= beta:
+            return self.LOWER
+        return self.EXACT
+
+    def table_test(self, item, depth, alpha, beta):
+        """Return True if stored search result settles node in window."""
+        stored_depth, value, bound = item
+        if stored_depth < depth:
+            return False
+        return (bound == self.EXACT or
+                (bound == self.LOWER and value >= beta) or
+                (bound == self.UPPER and value <= alpha))
+
+    def violates_bound(self, value, bound):
+        """Return True if current value is outside bound of search value."""
+        current = self.values[self.board]
+        if bound == self.LOWER:
+            return current < value
+        if bound == self.UPPER:
+            return current > value
+        return True
+
+    def evaluate_tree_bound(self, value, bound):
+        if self.violates_bound(value, bound):
+            self.evaluate_tree_state(value)
+
+    def tree_bound_delta(self, value, bound):
+        if self.violates_bound(value, bound):
+            self.tree_state_delta(value)
+
+    def cutoff_test(self, depth):
+        if not depth:
+            return True
+        if self.board.is_terminal():
+            self.values[self.board] = self.board.utility()
+            return True
+        return False